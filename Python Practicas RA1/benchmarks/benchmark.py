@@ -0,0 +1,177 @@
+"""Benchmarks del Mini-CRM (final/) y del gestor de horarios (practica3/).
+
+Genera datos sintéticos reproducibles (misma semilla -> mismos CSV) a varias
+escalas, mide carga, filtrado, agregación y exportación, y guarda los tiempos
+en un JSON para poder comparar ejecuciones.
+
+Uso:
+    python benchmark.py                        # escala 10k
+    python benchmark.py --escalas 10k 1M       # varias escalas
+    python benchmark.py --salida resultados/hoy.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BASE, "..", "final"))
+sys.path.insert(0, os.path.join(BASE, "..", "practica3"))
+
+import practica_final  # noqa: E402
+import practica3  # noqa: E402
+
+ESCALAS = {"10k": 10_000, "1M": 1_000_000, "10M": 10_000_000}
+CATEGORIAS = ["Música", "Tecnología", "Cultura", "Deporte", "Cine", "Gastronomía"]
+DIAS_SEMANA = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+FECHA_INICIO = date(2023, 1, 1)
+CONSULTAS_RANGO = 100
+
+# -------------------- GENERADOR --------------------
+
+def generar_crm(directorio, n_ventas, semilla):
+    """Escribe clientes.csv, eventos.csv y ventas.csv con n_ventas ventas."""
+    rnd = random.Random(semilla)
+    n_clientes = max(10, n_ventas // 10)
+    n_eventos = max(10, n_ventas // 1000)
+    os.makedirs(directorio, exist_ok=True)
+
+    with open(os.path.join(directorio, "clientes.csv"), "w", newline='') as f:
+        f.write("id,nombre,email,fecha_registro\n")
+        for i in range(1, n_clientes + 1):
+            fecha = FECHA_INICIO + timedelta(days=rnd.randrange(730))
+            f.write(f"{i},Cliente {i},cliente{i}@example.com,{fecha.isoformat()}\n")
+
+    precios = {}
+    with open(os.path.join(directorio, "eventos.csv"), "w", newline='') as f:
+        f.write("id,nombre,categoria,fecha,precio\n")
+        for i in range(1, n_eventos + 1):
+            fecha = FECHA_INICIO + timedelta(days=rnd.randrange(1095))
+            precios[i] = round(rnd.uniform(5, 150), 2)
+            f.write(f"E{i},Evento {i},{rnd.choice(CATEGORIAS)},{fecha.isoformat()},{precios[i]}\n")
+
+    with open(os.path.join(directorio, "ventas.csv"), "w", newline='') as f:
+        f.write("id,cliente_id,evento_id,fecha,precio\n")
+        for i in range(1, n_ventas + 1):
+            evento = rnd.randint(1, n_eventos)
+            fecha = FECHA_INICIO + timedelta(days=rnd.randrange(1095))
+            f.write(f"V{i},{rnd.randint(1, n_clientes)},E{evento},{fecha.isoformat()},{precios[evento]}\n")
+
+def generar_horarios(path, n_registros, semilla):
+    """Escribe un CSV de horarios (separado por ';') con n_registros fichajes."""
+    rnd = random.Random(semilla)
+    n_empleados = max(5, n_registros // 100)
+    with open(path, "w", newline='', encoding='utf-8') as f:
+        f.write("empleado;dia;entrada;salida\n")
+        for _ in range(n_registros):
+            entrada = rnd.randint(5, 14)
+            salida = min(23, entrada + rnd.randint(4, 9))
+            f.write(f"Empleado {rnd.randint(1, n_empleados)};{rnd.choice(DIAS_SEMANA)};{entrada};{salida}\n")
+
+def preparar_datos(directorio, n, semilla):
+    """Genera los datos de una escala salvo que ya existan con la misma semilla."""
+    marca = os.path.join(directorio, "generado.json")
+    esperado = {"filas": n, "semilla": semilla}
+    try:
+        with open(marca) as f:
+            if json.load(f) == esperado:
+                return
+    except (FileNotFoundError, ValueError):
+        pass
+    generar_crm(directorio, n, semilla)
+    generar_horarios(os.path.join(directorio, "horarios.csv"), n, semilla)
+    with open(marca, "w") as f:
+        json.dump(esperado, f)
+
+# -------------------- MEDICIÓN --------------------
+
+def medir(tiempos, etapa, funcion, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        resultado = funcion(*args, **kwargs)
+        tiempos[etapa] = round(time.perf_counter() - inicio, 6)
+    return resultado
+
+def consultas_rango(ventas, semilla):
+    rnd = random.Random(semilla)
+    total = 0
+    for _ in range(CONSULTAS_RANGO):
+        inicio = datetime.combine(FECHA_INICIO, datetime.min.time()) + timedelta(days=rnd.randrange(1095))
+        fin = inicio + timedelta(days=rnd.randrange(1, 31))
+        total += sum(1 for _ in ventas.filtrar_por_fechas(inicio, fin))
+    return total
+
+def benchmark_crm(directorio, semilla, workers):
+    tiempos = {}
+    clientes, eventos, ventas = medir(tiempos, "carga", practica_final.cargar_datos,
+                                      directorio, workers=workers, usar_snapshot=False)
+    medir(tiempos, "carga_snapshot_escritura", practica_final.guardar_snapshot, directorio,
+          practica_final.firma_origen([os.path.join(directorio, n) for n in ("clientes.csv", "eventos.csv", "ventas.csv")]),
+          clientes, eventos, ventas)
+    medir(tiempos, "carga_snapshot", practica_final.cargar_datos, directorio, workers=workers)
+    encontrados = medir(tiempos, f"filtro_{CONSULTAS_RANGO}_rangos", consultas_rango, ventas, semilla)
+    medir(tiempos, "estadisticas", practica_final.calcular_estadisticas, ventas, eventos)
+    medir(tiempos, "estadisticas_percentiles", practica_final.calcular_estadisticas, ventas, eventos, percentiles=True)
+    medir(tiempos, "exportar_informe", practica_final.exportar_informe, ventas,
+          os.path.join(directorio, "informe_resumen.csv"))
+    medir(tiempos, "streaming", practica_final.resumir_ventas_csv, os.path.join(directorio, "ventas.csv"), eventos)
+    return {"tiempos": tiempos, "ventas": len(ventas), "ventas_en_rangos": encontrados}
+
+def benchmark_horarios(directorio, workers):
+    tiempos = {}
+    gestor = practica3.GestorHorarios(os.path.join(directorio, "horarios.csv"))
+    medir(tiempos, "leer_csv", gestor.leer_csv)
+    medir(tiempos, "reconstruir", gestor._reconstruir)
+    medir(tiempos, "resumen_horarios", gestor.escribir_resumen_horarios, os.path.join(directorio, "resumen_horarios.csv"))
+    medir(tiempos, "resumen_semanal", gestor.escribir_resumen_semanal, os.path.join(directorio, "resumen_semanal.csv"))
+    medir(tiempos, "madrugadores", gestor.escribir_madrugadores, 8, os.path.join(directorio, "madrugadores.csv"))
+    medir(tiempos, "informes_procesos", gestor.generar_informes, hora_ref=8, procesos=workers or os.cpu_count(),
+          salidas={n: os.path.join(directorio, archivo) for n, (archivo, _, _) in practica3.INFORMES.items()})
+    return {"tiempos": tiempos, "registros": len(gestor.registros), "empleados": len(gestor.empleados)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--escalas", nargs="+", choices=list(ESCALAS), default=["10k"])
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--datos", default=os.path.join(BASE, "datos"),
+                        help="carpeta donde se generan (y reutilizan) los CSV sintéticos")
+    parser.add_argument("--salida", default=None, help="JSON de resultados (por defecto resultados/<fecha>.json)")
+    args = parser.parse_args()
+
+    resultados = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": practica_final.np is not None,
+        "semilla": args.semilla,
+        "escalas": {},
+    }
+    for escala in args.escalas:
+        directorio = os.path.join(args.datos, escala)
+        print(f"[{escala}] generando datos en {directorio}...")
+        generacion = {}
+        medir(generacion, "generacion", preparar_datos, directorio, ESCALAS[escala], args.semilla)
+        print(f"[{escala}] midiendo...")
+        resultados["escalas"][escala] = {
+            "generacion": generacion["generacion"],
+            "crm": benchmark_crm(directorio, args.semilla, args.workers),
+            "horarios": benchmark_horarios(directorio, args.workers),
+        }
+        print(json.dumps(resultados["escalas"][escala], indent=2, ensure_ascii=False))
+
+    salida = args.salida or os.path.join(BASE, "resultados", datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {salida}")
+
+if __name__ == "__main__":
+    main()
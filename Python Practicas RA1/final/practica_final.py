@@ -1,6 +1,47 @@
+import argparse
+import contextlib
 import csv
+import glob
+import heapq
+import mmap
+import os
+import pickle
 import re
-from datetime import datetime
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from operator import itemgetter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import metricas  # noqa: E402
+
+TAM_BLOQUE = 10000
+
+# -------------------- FECHAS --------------------
+
+def parsear_fecha(texto):
+    """Convierte 'YYYY-MM-DD' a datetime sin pasar por strptime en el caso habitual."""
+    if len(texto) == 10 and texto[4] == "-" and texto[7] == "-":
+        anio, mes, dia = texto[:4], texto[5:7], texto[8:]
+        if anio.isdigit() and mes.isdigit() and dia.isdigit():
+            try:
+                return datetime(int(anio), int(mes), int(dia))
+            except ValueError:
+                pass
+    return datetime.strptime(texto, "%Y-%m-%d")
 
 # -------------------- CLASES --------------------
 
@@ -9,7 +50,7 @@ class Cliente:
         self.id = id
         self.nombre = nombre
         self.email = email
-        self.fecha_registro = datetime.strptime(fecha_registro, "%Y-%m-%d")
+        self.fecha_registro = parsear_fecha(fecha_registro)
 
     def antiguedad_dias(self):
         return (datetime.today().date() - self.fecha_registro.date()).days
@@ -22,7 +63,7 @@ class Evento:
         self.id = id
         self.nombre = nombre
         self.categoria = categoria
-        self.fecha = datetime.strptime(fecha, "%Y-%m-%d")
+        self.fecha = parsear_fecha(fecha)
         self.precio = float(precio)
 
     def dias_hasta_evento(self):
@@ -36,12 +77,734 @@ class Venta:
         self.id = id
         self.cliente_id = cliente_id
         self.evento_id = evento_id
-        self.fecha = datetime.strptime(fecha, "%Y-%m-%d")
+        self.fecha = parsear_fecha(fecha)
         self.precio = float(precio)
 
     def __str__(self):
         return f"{self.id} - Cliente: {self.cliente_id}, Evento: {self.evento_id}, Precio: {self.precio}"
 
+# -------------------- ALMACÉN DE VENTAS --------------------
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+def fecha_a_dias(fecha):
+    return fecha.toordinal() - EPOCH_ORDINAL
+
+def dias_a_fecha(dias):
+    return datetime.fromordinal(dias + EPOCH_ORDINAL)
+
+def dias_iso(texto):
+    return parsear_fecha(texto).toordinal() - EPOCH_ORDINAL
+
+class VentaVista:
+    """Vista de solo lectura sobre una fila de VentasStore, con la misma interfaz que Venta."""
+    __slots__ = ("_store", "_pos")
+
+    def __init__(self, store, pos):
+        self._store = store
+        self._pos = pos
+
+    @property
+    def id(self):
+        return self._store.ids[self._pos]
+
+    @property
+    def cliente_id(self):
+        return self._store.cliente_id(self._pos)
+
+    @property
+    def evento_id(self):
+        return self._store.evento_id(self._pos)
+
+    @property
+    def fecha(self):
+        return dias_a_fecha(self._store.fechas[self._pos])
+
+    @property
+    def precio(self):
+        return self._store.precios[self._pos]
+
+    def __str__(self):
+        return f"{self.id} - Cliente: {self.cliente_id}, Evento: {self.evento_id}, Precio: {self.precio}"
+
+class IndiceFechas:
+    """Posiciones de ventas ordenadas por fecha (en días) para consultas por rango.
+
+    Las inserciones en orden se añaden al final; las desordenadas quedan
+    pendientes y se integran en la siguiente consulta.
+    """
+
+    def __init__(self):
+        self.claves = array("i")
+        self.posiciones = array("i")
+        self._pend_claves = array("i")
+        self._pend_posiciones = array("i")
+
+    def insertar(self, dias, pos):
+        if not self._pend_claves and (not self.claves or dias >= self.claves[-1]):
+            self.claves.append(dias)
+            self.posiciones.append(pos)
+        else:
+            self._pend_claves.append(dias)
+            self._pend_posiciones.append(pos)
+
+    def extender(self, dias, pos_inicial):
+        """Añade en bloque las fechas de las posiciones pos_inicial, pos_inicial + 1, ..."""
+        self._pend_claves.extend(dias)
+        self._pend_posiciones.extend(range(pos_inicial, pos_inicial + len(dias)))
+
+    def _integrar_pendientes(self):
+        # ordena solo las pendientes y las mezcla con las ya ordenadas: O(n + m log m);
+        # los tramos entre pendientes se copian en bloque con slices
+        pend_claves, pend_posiciones = self._pend_claves, self._pend_posiciones
+        orden = sorted(range(len(pend_claves)), key=pend_claves.__getitem__)
+        viejas_claves, viejas_posiciones = self.claves, self.posiciones
+        claves, posiciones = array("i"), array("i")
+        previo = 0
+        for j in orden:
+            dias = pend_claves[j]
+            i = bisect_right(viejas_claves, dias, previo)
+            claves.extend(viejas_claves[previo:i])
+            posiciones.extend(viejas_posiciones[previo:i])
+            claves.append(dias)
+            posiciones.append(pend_posiciones[j])
+            previo = i
+        claves.extend(viejas_claves[previo:])
+        posiciones.extend(viejas_posiciones[previo:])
+        self.claves, self.posiciones = claves, posiciones
+        self._pend_claves = array("i")
+        self._pend_posiciones = array("i")
+
+    def rango(self, desde, hasta):
+        if self._pend_claves:
+            self._integrar_pendientes()
+        inicio = bisect_left(self.claves, desde)
+        fin = bisect_right(self.claves, hasta)
+        posiciones = self.posiciones
+        for i in range(inicio, fin):
+            yield posiciones[i]
+
+class AcumuladorVentas:
+    """Agregados de ventas que se actualizan en O(1) por venta, sin volver a recorrerlas.
+
+    Si se le pasa el diccionario de eventos también acumula ingresos por categoría.
+    """
+
+    def __init__(self, eventos=None):
+        self.eventos = eventos if eventos is not None else {}
+        self.n = 0
+        self.total = 0.0
+        self.minimo = None
+        self.maximo = None
+        self.ingresos_por_evento = {}
+        self.ingresos_por_categoria = {}
+        self.ingresos_por_cliente = {}
+        self.ventas_por_dia = {}
+
+    def agregar(self, evento_id, precio, cliente_id=None, dias=None):
+        self.n += 1
+        self.total += precio
+        if self.minimo is None or precio < self.minimo:
+            self.minimo = precio
+        if self.maximo is None or precio > self.maximo:
+            self.maximo = precio
+        self.ingresos_por_evento[evento_id] = self.ingresos_por_evento.get(evento_id, 0) + precio
+        if cliente_id is not None:
+            self.ingresos_por_cliente[cliente_id] = self.ingresos_por_cliente.get(cliente_id, 0) + precio
+        if dias is not None:
+            self.ventas_por_dia[dias] = self.ventas_por_dia.get(dias, 0) + 1
+        evento = self.eventos.get(evento_id)
+        if evento is not None:
+            categoria = evento.categoria
+            self.ingresos_por_categoria[categoria] = self.ingresos_por_categoria.get(categoria, 0) + precio
+
+    def fusionar(self, otro):
+        """Suma a este acumulador los agregados parciales de otro (p. ej. de otra partición)."""
+        if not otro.n:
+            return
+        self.n += otro.n
+        self.total += otro.total
+        if self.minimo is None or otro.minimo < self.minimo:
+            self.minimo = otro.minimo
+        if self.maximo is None or otro.maximo > self.maximo:
+            self.maximo = otro.maximo
+        for cliente_id, ingresos in otro.ingresos_por_cliente.items():
+            self.ingresos_por_cliente[cliente_id] = self.ingresos_por_cliente.get(cliente_id, 0) + ingresos
+        for dias, n in otro.ventas_por_dia.items():
+            self.ventas_por_dia[dias] = self.ventas_por_dia.get(dias, 0) + n
+        for evento_id, ingresos in otro.ingresos_por_evento.items():
+            self.ingresos_por_evento[evento_id] = self.ingresos_por_evento.get(evento_id, 0) + ingresos
+            evento = self.eventos.get(evento_id)
+            if evento is not None:
+                categoria = evento.categoria
+                self.ingresos_por_categoria[categoria] = self.ingresos_por_categoria.get(categoria, 0) + ingresos
+
+    def categorias(self):
+        return set(self.ingresos_por_categoria)
+
+    def resumen_precios(self):
+        return (self.minimo, self.maximo, self.total / self.n) if self.n else (0, 0, 0)
+
+class ColumnaIds:
+    """Ids de venta en columnas compactas: prefijo internado (int32) + número (int64).
+
+    Un id como "V123" se guarda como ("V", 123); los ceros a la izquierda van
+    en el prefijo ("V007" -> "V00", 7), así que siempre se reconstruye igual.
+    Los ids sin sufijo numérico (o con más de 18 cifras) van a un dict aparte.
+    """
+
+    def __init__(self):
+        self.prefijos = array("i")
+        self.numeros = array("q")
+        self.tabla_prefijos = []
+        self._codigos_prefijos = {}
+        self.otros = {}
+
+    def append(self, id):
+        cuerpo = id.rstrip("0123456789")
+        cifras = id[len(cuerpo):].lstrip("0") or ("0" if len(id) > len(cuerpo) else "")
+        if cifras and len(cifras) <= 18:
+            prefijo = id[:len(id) - len(cifras)]
+            self.prefijos.append(VentasStore._internar(prefijo, self.tabla_prefijos, self._codigos_prefijos))
+            self.numeros.append(int(cifras))
+        else:
+            self.otros[len(self.prefijos)] = id
+            self.prefijos.append(-1)
+            self.numeros.append(0)
+
+    def extend(self, otra):
+        inicio = len(self.prefijos)
+        mapa = [VentasStore._internar(p, self.tabla_prefijos, self._codigos_prefijos) for p in otra.tabla_prefijos]
+        self.prefijos.extend(array("i", (-1 if c < 0 else mapa[c] for c in otra.prefijos)))
+        self.numeros.extend(otra.numeros)
+        for pos, id in otra.otros.items():
+            self.otros[inicio + pos] = id
+
+    def __getitem__(self, pos):
+        codigo = self.prefijos[pos]
+        if codigo < 0:
+            return self.otros[pos if pos >= 0 else pos + len(self.prefijos)]
+        return f"{self.tabla_prefijos[codigo]}{self.numeros[pos]}"
+
+    def __len__(self):
+        return len(self.prefijos)
+
+class VentasStore:
+    """Ventas guardadas por columnas en arrays compactos.
+
+    Las fechas se guardan como días desde 1970-01-01 (int32), los precios como
+    float64, los ids de cliente/evento como códigos enteros internados y los
+    ids de venta en una ColumnaIds.
+    """
+
+    def __init__(self, eventos=None):
+        self.ids = ColumnaIds()
+        self.fechas = array("i")
+        self.precios = array("d")
+        self.clientes = array("i")
+        self.eventos = array("i")
+        self.tabla_clientes = []
+        self.tabla_eventos = []
+        self._codigos_clientes = {}
+        self._codigos_eventos = {}
+        # índices inversos: código de cliente/evento -> posiciones de sus ventas
+        self.posiciones_por_cliente = []
+        self.posiciones_por_evento = []
+        self.indice_fechas = IndiceFechas()
+        self.agregados = AcumuladorVentas(eventos)
+
+    @staticmethod
+    def _internar(valor, tabla, codigos):
+        codigo = codigos.get(valor)
+        if codigo is None:
+            codigo = len(tabla)
+            codigos[valor] = codigo
+            tabla.append(valor)
+        return codigo
+
+    @staticmethod
+    def _posiciones(indice, codigo):
+        while len(indice) <= codigo:
+            indice.append(array("i"))
+        return indice[codigo]
+
+    def append(self, id, cliente_id, evento_id, fecha, precio):
+        dias = dias_iso(fecha) if isinstance(fecha, str) else fecha_a_dias(fecha)
+        return self.append_dias(id, cliente_id, evento_id, dias, precio)
+
+    def append_dias(self, id, cliente_id, evento_id, dias, precio):
+        pos = len(self.ids)
+        self.ids.append(id)
+        self.fechas.append(dias)
+        self.precios.append(float(precio))
+        codigo_cliente = self._internar(cliente_id, self.tabla_clientes, self._codigos_clientes)
+        codigo_evento = self._internar(evento_id, self.tabla_eventos, self._codigos_eventos)
+        self.clientes.append(codigo_cliente)
+        self.eventos.append(codigo_evento)
+        self._posiciones(self.posiciones_por_cliente, codigo_cliente).append(pos)
+        self._posiciones(self.posiciones_por_evento, codigo_evento).append(pos)
+        self.indice_fechas.insertar(dias, pos)
+        self.agregados.agregar(evento_id, self.precios[pos], cliente_id, dias)
+        return pos
+
+    def agregar(self, venta):
+        return self.append(venta.id, venta.cliente_id, venta.evento_id, venta.fecha, venta.precio)
+
+    def fusionar(self, otro):
+        """Añade al final todas las ventas de otro VentasStore, reasignando sus códigos internos."""
+        inicio = len(self.ids)
+        mapa_clientes = [self._internar(c, self.tabla_clientes, self._codigos_clientes) for c in otro.tabla_clientes]
+        mapa_eventos = [self._internar(e, self.tabla_eventos, self._codigos_eventos) for e in otro.tabla_eventos]
+        self.ids.extend(otro.ids)
+        self.fechas.extend(otro.fechas)
+        self.precios.extend(otro.precios)
+        self.clientes.extend(array("i", (mapa_clientes[c] for c in otro.clientes)))
+        self.eventos.extend(array("i", (mapa_eventos[e] for e in otro.eventos)))
+        for indice, otro_indice, mapa in ((self.posiciones_por_cliente, otro.posiciones_por_cliente, mapa_clientes),
+                                          (self.posiciones_por_evento, otro.posiciones_por_evento, mapa_eventos)):
+            for codigo, posiciones in enumerate(otro_indice):
+                self._posiciones(indice, mapa[codigo]).extend(array("i", (p + inicio for p in posiciones)))
+        self.indice_fechas.extender(otro.fechas, inicio)
+        self.agregados.fusionar(otro.agregados)
+
+    def filtrar_por_fechas(self, desde, hasta):
+        """Itera perezosamente las ventas con desde <= fecha <= hasta, ordenadas por fecha."""
+        for pos in self.indice_fechas.rango(fecha_a_dias(desde), fecha_a_dias(hasta)):
+            yield VentaVista(self, pos)
+
+    def ventas_de_cliente(self, cliente_id):
+        codigo = self._codigos_clientes.get(cliente_id)
+        posiciones = self.posiciones_por_cliente[codigo] if codigo is not None else ()
+        return (VentaVista(self, pos) for pos in posiciones)
+
+    def ventas_de_evento(self, evento_id):
+        codigo = self._codigos_eventos.get(evento_id)
+        posiciones = self.posiciones_por_evento[codigo] if codigo is not None else ()
+        return (VentaVista(self, pos) for pos in posiciones)
+
+    def clientes_de_evento(self, evento_id):
+        """Ids de los clientes con alguna venta del evento."""
+        codigo = self._codigos_eventos.get(evento_id)
+        if codigo is None:
+            return set()
+        tabla, clientes = self.tabla_clientes, self.clientes
+        return {tabla[clientes[pos]] for pos in self.posiciones_por_evento[codigo]}
+
+    def cliente_id(self, pos):
+        return self.tabla_clientes[self.clientes[pos]]
+
+    def evento_id(self, pos):
+        return self.tabla_eventos[self.eventos[pos]]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, pos):
+        if pos < 0:
+            pos += len(self.ids)
+        if not 0 <= pos < len(self.ids):
+            raise IndexError("índice de venta fuera de rango")
+        return VentaVista(self, pos)
+
+    def __iter__(self):
+        for pos in range(len(self.ids)):
+            yield VentaVista(self, pos)
+
+class IndiceRelacional:
+    """Índices hash entre ventas, clientes y eventos.
+
+    Las posiciones de ventas por cliente/evento las mantiene el propio
+    VentasStore en cada inserción; aquí se añade categoría -> eventos, que
+    se construye una vez al cargar y se actualiza con agregar_evento().
+    """
+
+    def __init__(self, eventos, ventas):
+        self.eventos = eventos
+        self.ventas = ventas
+        self.eventos_por_categoria = {}
+        for evento in eventos.values():
+            self.eventos_por_categoria.setdefault(evento.categoria, []).append(evento.id)
+
+    def agregar_evento(self, evento):
+        self.eventos[evento.id] = evento
+        self.eventos_por_categoria.setdefault(evento.categoria, []).append(evento.id)
+
+    def eventos_de_categoria(self, categoria):
+        return [self.eventos[eid] for eid in self.eventos_por_categoria.get(categoria, ())]
+
+    def ventas_de_categoria(self, categoria):
+        for evento_id in self.eventos_por_categoria.get(categoria, ()):
+            yield from self.ventas.ventas_de_evento(evento_id)
+
+    def ingresos_categoria(self, categoria):
+        return self.ventas.agregados.ingresos_por_categoria.get(categoria, 0)
+
+    def gasto_cliente(self, cliente_id):
+        return self.ventas.agregados.ingresos_por_cliente.get(cliente_id, 0)
+
+    def clientes_de_evento(self, evento_id):
+        return self.ventas.clientes_de_evento(evento_id)
+
+# -------------------- SNAPSHOT --------------------
+
+SNAPSHOT_DIR = ".snapshot"
+SNAPSHOT_VERSION = 4
+# columna de ventas -> tipo del array; cada una va en su propio .bin
+COLUMNAS_VENTAS = {"fechas": "i", "precios": "d", "clientes": "i", "eventos": "i",
+                   "ids_prefijos": "i", "ids_numeros": "q"}
+
+def firma_origen(rutas):
+    """(ruta, mtime, tamaño) de cada CSV de origen; si cambia, el snapshot deja de valer."""
+    firma = []
+    for ruta in rutas:
+        try:
+            st = os.stat(ruta)
+        except FileNotFoundError:
+            firma.append((os.path.abspath(ruta), None, None))
+            continue
+        firma.append((os.path.abspath(ruta), st.st_mtime_ns, st.st_size))
+    return firma
+
+def _escribir_atomico(ruta, datos):
+    tmp = ruta + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(datos)
+    os.replace(tmp, ruta)
+
+def _columnas(ventas):
+    return {"fechas": ventas.fechas, "precios": ventas.precios, "clientes": ventas.clientes,
+            "eventos": ventas.eventos, "ids_prefijos": ventas.ids.prefijos, "ids_numeros": ventas.ids.numeros}
+
+def _datos_ventas(ventas):
+    """Todo lo que no son columnas, como datos planos (listas, dicts y arrays)."""
+    indice = ventas.indice_fechas
+    return {
+        "tabla_clientes": ventas.tabla_clientes,
+        "tabla_eventos": ventas.tabla_eventos,
+        "posiciones_por_cliente": ventas.posiciones_por_cliente,
+        "posiciones_por_evento": ventas.posiciones_por_evento,
+        "ids_tabla_prefijos": ventas.ids.tabla_prefijos,
+        "ids_otros": ventas.ids.otros,
+        "indice_fechas": (indice.claves, indice.posiciones, indice._pend_claves, indice._pend_posiciones),
+        "agregados": {k: v for k, v in vars(ventas.agregados).items() if k != "eventos"},
+    }
+
+def _reconstruir_ventas(datos, columnas, eventos):
+    ventas = VentasStore(eventos)
+    ventas.fechas, ventas.precios = columnas["fechas"], columnas["precios"]
+    ventas.clientes, ventas.eventos = columnas["clientes"], columnas["eventos"]
+    ventas.tabla_clientes, ventas.tabla_eventos = datos["tabla_clientes"], datos["tabla_eventos"]
+    ventas._codigos_clientes = {v: i for i, v in enumerate(ventas.tabla_clientes)}
+    ventas._codigos_eventos = {v: i for i, v in enumerate(ventas.tabla_eventos)}
+    ventas.posiciones_por_cliente = datos["posiciones_por_cliente"]
+    ventas.posiciones_por_evento = datos["posiciones_por_evento"]
+    ids = ventas.ids
+    ids.prefijos, ids.numeros = columnas["ids_prefijos"], columnas["ids_numeros"]
+    ids.tabla_prefijos, ids.otros = datos["ids_tabla_prefijos"], datos["ids_otros"]
+    ids._codigos_prefijos = {v: i for i, v in enumerate(ids.tabla_prefijos)}
+    indice = ventas.indice_fechas
+    indice.claves, indice.posiciones, indice._pend_claves, indice._pend_posiciones = datos["indice_fechas"]
+    vars(ventas.agregados).update(datos["agregados"])
+    return ventas
+
+def _objeto(clase, atributos):
+    """Recrea un Cliente/Evento a partir de sus atributos sin volver a parsear la fecha."""
+    obj = clase.__new__(clase)
+    vars(obj).update(atributos)
+    return obj
+
+@metricas.medido("crm.guardar_snapshot")
+def guardar_snapshot(directorio, firma, clientes, eventos, ventas):
+    """Guarda los datos cargados en directorio/.snapshot.
+
+    Cada columna de ventas va en su propio fichero binario (mapeable con
+    mmap); el resto se serializa con pickle junto con la firma de los CSV,
+    solo como datos planos (sin instancias de clases del programa), para
+    que lo pueda leer cualquier módulo que importe este, también __main__.
+    """
+    carpeta = os.path.join(directorio, SNAPSHOT_DIR)
+    os.makedirs(carpeta, exist_ok=True)
+    for nombre, columna in _columnas(ventas).items():
+        _escribir_atomico(os.path.join(carpeta, nombre + ".bin"), columna.tobytes())
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "byteorder": sys.byteorder,
+        "firma": firma,
+        "clientes": [vars(c) for c in clientes.values()],
+        "eventos": [vars(e) for e in eventos.values()],
+        "ventas": _datos_ventas(ventas),
+    }
+    # meta.pickle se escribe el último: sin él el snapshot no se considera válido
+    _escribir_atomico(os.path.join(carpeta, "meta.pickle"), pickle.dumps(meta, pickle.HIGHEST_PROTOCOL))
+
+def _leer_columna(ruta, tipo):
+    columna = array(tipo)
+    with open(ruta, "rb") as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                columna.frombytes(mm)
+    return columna
+
+@metricas.medido("crm.cargar_snapshot")
+def cargar_snapshot(directorio, firma):
+    """Devuelve (clientes, eventos, ventas) del snapshot o None si falta, está desactualizado o no se puede leer."""
+    carpeta = os.path.join(directorio, SNAPSHOT_DIR)
+    try:
+        with open(os.path.join(carpeta, "meta.pickle"), "rb") as f:
+            meta = pickle.load(f)
+        if (meta.get("version") != SNAPSHOT_VERSION or meta.get("byteorder") != sys.byteorder
+                or meta.get("firma") != firma):
+            return None
+        columnas = {nombre: _leer_columna(os.path.join(carpeta, nombre + ".bin"), tipo)
+                    for nombre, tipo in COLUMNAS_VENTAS.items()}
+        if len({len(c) for c in columnas.values()}) > 1:
+            return None
+        clientes = {c["id"]: _objeto(Cliente, c) for c in meta["clientes"]}
+        eventos = {e["id"]: _objeto(Evento, e) for e in meta["eventos"]}
+        ventas = _reconstruir_ventas(meta["ventas"], columnas, eventos)
+    except Exception:
+        # cualquier fallo (snapshot corrupto, de otra versión...) es un fallo de caché: se releen los CSV
+        return None
+    return clientes, eventos, ventas
+
+# -------------------- ALTA DE CLIENTES --------------------
+
+@contextlib.contextmanager
+def bloqueo_exclusivo(path):
+    """Cerrojo exclusivo entre procesos sobre el archivo `path` (se crea si no existe)."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK se rinde tras ~10 s; se sigue esperando
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+class EscritorClientes:
+    """Añade clientes al final de clientes.csv en lotes, con un único fsync por lote.
+
+    Las filas se guardan al llegar a `tam_lote` o al llamar a flush()/cerrar();
+    no hay volcado por tiempo, así que quien quiera durabilidad inmediata
+    debe llamar a flush() tras cada alta (como hace guardar_cliente).
+
+    Los ids salen de un contador monótono guardado en `<path>.seq`, así que no
+    se repiten aunque se borren clientes del CSV. Reservar ids y añadir filas
+    se hace bajo el cerrojo `<path>.lock`, de modo que varios procesos (el
+    menú y servicio.py) pueden escribir en el mismo CSV. Con reserva > 1 los
+    ids se reservan de ese en ese; los que no se lleguen a usar se pierden.
+    """
+
+    CAMPOS = ["id", "nombre", "email", "fecha_registro"]
+
+    def __init__(self, path="data/clientes.csv", tam_lote=1000, reserva=1):
+        self.path = path
+        self.path_seq = path + ".seq"
+        self.path_lock = path + ".lock"
+        self.tam_lote = tam_lote
+        self.reserva = reserva
+        self._pendientes = []
+        self._siguiente = self._limite = 0
+
+    def _leer_contador(self):
+        try:
+            with open(self.path_seq) as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            pass
+        # sin contador: se parte del mayor id numérico que ya tenga el CSV
+        ultimo = 0
+        try:
+            with open(self.path, newline='') as f:
+                for row in csv.DictReader(f):
+                    if row.get("id", "").isdigit():
+                        ultimo = max(ultimo, int(row["id"]))
+        except FileNotFoundError:
+            pass
+        return ultimo
+
+    def _escribir_contador(self, valor):
+        tmp = self.path_seq + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(str(valor))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path_seq)
+
+    def _reservar(self, n):
+        with bloqueo_exclusivo(self.path_lock):
+            ultimo = self._leer_contador()
+            self._escribir_contador(ultimo + n)
+        self._siguiente, self._limite = ultimo + 1, ultimo + n + 1
+
+    def reservar(self, n):
+        """Reserva de una vez (un cerrojo y un fsync) los n ids que darán las próximas llamadas a siguiente_id."""
+        if n > self._limite - self._siguiente:
+            self._reservar(n)
+
+    def siguiente_id(self):
+        if self._siguiente >= self._limite:
+            self._reservar(self.reserva)
+        nuevo = self._siguiente
+        self._siguiente += 1
+        return str(nuevo)
+
+    def agregar(self, cliente):
+        self._pendientes.append([cliente.id, cliente.nombre, cliente.email, cliente.fecha_registro.strftime("%Y-%m-%d")])
+        if len(self._pendientes) >= self.tam_lote:
+            self.flush()
+
+    def flush(self):
+        if not self._pendientes:
+            return
+        with bloqueo_exclusivo(self.path_lock):
+            nuevo = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, "a", newline='') as f:
+                writer = csv.writer(f)
+                if nuevo:
+                    writer.writerow(self.CAMPOS)
+                writer.writerows(self._pendientes)
+                f.flush()
+                os.fsync(f.fileno())
+        self._pendientes = []
+
+    def descartar(self):
+        """Olvida las filas sin guardar (p. ej. tras un flush fallido); sus ids no se reutilizan."""
+        self._pendientes = []
+
+    def cerrar(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+def importar_clientes(path_origen, escritor, clientes=None):
+    """Alta masiva desde un CSV con columnas nombre,email,fecha_registro.
+
+    Devuelve (añadidos, rechazados); las filas con email o fecha inválidos se descartan.
+    """
+    anadidos = rechazados = 0
+    with open(path_origen, newline='') as f:
+        for row in csv.DictReader(f):
+            nombre, email, fecha = row.get("nombre", ""), row.get("email", ""), row.get("fecha_registro", "")
+            if not validar_email(email) or not validar_fecha(fecha):
+                rechazados += 1
+                continue
+            cliente = Cliente(escritor.siguiente_id(), nombre, email, fecha)
+            escritor.agregar(cliente)
+            if clientes is not None:
+                clientes[cliente.id] = cliente
+            anadidos += 1
+    escritor.flush()
+    return anadidos, rechazados
+
+# -------------------- ESTADÍSTICAS --------------------
+
+PERCENTILES = (25, 50, 75, 90)
+
+def percentil(ordenados, q):
+    """Percentil q (0-100) con interpolación lineal, igual que numpy.percentile."""
+    pos = (len(ordenados) - 1) * (q / 100)
+    i = int(pos)
+    t = pos - i
+    a = ordenados[i]
+    b = ordenados[min(i + 1, len(ordenados) - 1)]
+    # misma fórmula que numpy para que ambos backends den el mismo resultado
+    return b - (b - a) * (1 - t) if t >= 0.5 else a + (b - a) * t
+
+def _percentiles_python(precios):
+    ordenados = sorted(precios)
+    return {q: percentil(ordenados, q) for q in PERCENTILES} if ordenados else {}
+
+def _percentiles_numpy(precios):
+    if not len(precios):
+        return {}
+    vista = np.frombuffer(precios, dtype=np.float64)
+    valores = np.percentile(vista, PERCENTILES)
+    # liberar la vista antes de volver: mientras exista, el array no puede crecer
+    del vista
+    return {q: float(v) for q, v in zip(PERCENTILES, valores)}
+
+@metricas.medido("crm.estadisticas")
+def calcular_estadisticas(ventas, eventos, percentiles=False, backend=None):
+    """Estadísticas de ventas en un dict.
+
+    Totales, ingresos por evento/categoría y min/max/media salen de los
+    agregados incrementales en O(eventos + categorías), sin recorrer las
+    ventas. Los percentiles sí necesitan todos los precios: solo se calculan
+    con percentiles=True y un VentasStore, con NumPy si está instalado (o
+    backend="numpy") y si no en Python puro; ambos dan los mismos números.
+    """
+    agregados = ventas if isinstance(ventas, AcumuladorVentas) else ventas.agregados
+    hoy = fecha_a_dias(date.today())
+    dias = [fecha_a_dias(e.fecha) - hoy for e in eventos.values()]
+    stats = {
+        "total": agregados.total,
+        "ingresos_por_evento": dict(agregados.ingresos_por_evento),
+        "ingresos_por_categoria": dict(agregados.ingresos_por_categoria),
+        "dias_evento_mas_proximo": min(dias) if dias else None,
+        "resumen_precios": agregados.resumen_precios(),
+        "percentiles": {},
+    }
+    if percentiles and not isinstance(ventas, AcumuladorVentas):
+        if backend is None:
+            backend = "numpy" if np is not None else "python"
+        if backend == "numpy":
+            if np is None:
+                raise RuntimeError("NumPy no está instalado")
+            stats["percentiles"] = _percentiles_numpy(ventas.precios)
+        else:
+            stats["percentiles"] = _percentiles_python(ventas.precios)
+    return stats
+
+# -------------------- RANKINGS --------------------
+
+# tipo de ranking -> (columna de la clave, columna del valor)
+RANKINGS = {
+    "eventos": ("Evento ID", "Ingresos Totales"),
+    "clientes": ("Cliente ID", "Gasto Total"),
+    "categorias": ("Categoría", "Ingresos Totales"),
+    "dias": ("Fecha", "Ventas"),
+}
+
+def top_k(pares, k):
+    """Los k pares (clave, valor) de mayor valor con un heap acotado: O(n log k) y memoria O(k).
+
+    A igualdad de valor se respeta el orden de llegada.
+    """
+    return heapq.nlargest(k, pares, key=itemgetter(1))
+
+def ranking(ventas, tipo, k=10):
+    """Top-k de un VentasStore o de un AcumuladorVentas (p. ej. de resumir_ventas_csv)."""
+    agregados = ventas if isinstance(ventas, AcumuladorVentas) else ventas.agregados
+    if tipo == "eventos":
+        return top_k(agregados.ingresos_por_evento.items(), k)
+    if tipo == "clientes":
+        return top_k(agregados.ingresos_por_cliente.items(), k)
+    if tipo == "categorias":
+        return top_k(agregados.ingresos_por_categoria.items(), k)
+    if tipo == "dias":
+        return [(dias_a_fecha(d).strftime("%Y-%m-%d"), n) for d, n in top_k(agregados.ventas_por_dia.items(), k)]
+    raise ValueError(f"Ranking desconocido: {tipo}")
+
+def ranking_csv(tipo, k=10, path="data/ventas.csv", eventos=None, tam_bloque=TAM_BLOQUE):
+    """Top-k leyendo el CSV de ventas en streaming, sin cargar las ventas en memoria."""
+    return ranking(resumir_ventas_csv(path, eventos, tam_bloque), tipo, k)
+
 # -------------------- FUNCIONES --------------------
 
 def validar_email(email):
@@ -53,55 +816,180 @@ def validar_fecha(fecha_str):
     except ValueError:
         return None
 
-def cargar_datos():
-    clientes, eventos, ventas = {}, {}, []
+def leer_bloques(path, tam_bloque=TAM_BLOQUE):
+    """Recorre un CSV con cabecera y devuelve (cabecera, bloque) con hasta tam_bloque filas cada vez."""
+    with open(path, newline='') as f:
+        lector = csv.reader(f)
+        cabecera = next(lector, None)
+        if cabecera is None:
+            return
+        bloque = []
+        for fila in lector:
+            if not fila:
+                continue
+            bloque.append(fila)
+            if len(bloque) >= tam_bloque:
+                yield cabecera, bloque
+                bloque = []
+        if bloque:
+            yield cabecera, bloque
 
-    try:
-        with open("data/clientes.csv", newline='') as f:
-            for row in csv.DictReader(f):
-                cliente = Cliente(**row)
-                clientes[cliente.id] = cliente
-    except FileNotFoundError:
-        print("Archivo clientes.csv no encontrado.")
+def bloques_ventas(path="data/ventas.csv", tam_bloque=TAM_BLOQUE):
+    """Genera bloques de ventas ya convertidas a (id, cliente_id, evento_id, dias, precio)."""
+    for cabecera, bloque in leer_bloques(path, tam_bloque):
+        i_id, i_cli, i_evt, i_fecha, i_precio = (cabecera.index(c) for c in ("id", "cliente_id", "evento_id", "fecha", "precio"))
+        yield [(fila[i_id], fila[i_cli], fila[i_evt], dias_iso(fila[i_fecha]), float(fila[i_precio])) for fila in bloque]
 
-    try:
-        with open("data/eventos.csv", newline='') as f:
-            for row in csv.DictReader(f):
-                evento = Evento(**row)
-                eventos[evento.id] = evento
-    except FileNotFoundError:
-        print("Archivo eventos.csv no encontrado.")
+@metricas.medido("crm.resumir_ventas_csv")
+def resumir_ventas_csv(path="data/ventas.csv", eventos=None, tam_bloque=TAM_BLOQUE):
+    acumulador = AcumuladorVentas(eventos)
+    for bloque in bloques_ventas(path, tam_bloque):
+        for _, cliente_id, evento_id, dias, precio in bloque:
+            acumulador.agregar(evento_id, precio, cliente_id, dias)
+        metricas.contar("crm.filas_leidas", len(bloque))
+    if metricas.ACTIVO:
+        metricas.contar("crm.bytes_leidos", metricas.tamano(path))
+    return acumulador
+
+def cargar_particion_ventas(path, tam_bloque=TAM_BLOQUE):
+    """Carga un único CSV de ventas en su propio VentasStore (se ejecuta en los procesos del pool)."""
+    ventas = VentasStore()
+    for bloque in bloques_ventas(path, tam_bloque):
+        for fila in bloque:
+            ventas.append_dias(*fila)
+    return ventas
+
+def particiones_ventas(origen):
+    """Lista ordenada de CSV de ventas: un directorio (ventas*.csv) o un patrón glob."""
+    if os.path.isdir(origen):
+        origen = os.path.join(origen, "ventas*.csv")
+    return sorted(glob.glob(origen))
+
+@metricas.medido("crm.cargar_datos")
+def cargar_datos(directorio="data", ventas_origen=None, workers=None, usar_snapshot=True):
+    """Carga clientes, eventos y todas las particiones de ventas.
+
+    Si existe un snapshot cuyos CSV de origen no han cambiado (mtime y
+    tamaño) se usa directamente; si no, se leen los CSV y se regenera.
+    """
+    rutas = particiones_ventas(ventas_origen or directorio)
+    firma = firma_origen([os.path.join(directorio, "clientes.csv"), os.path.join(directorio, "eventos.csv")] + rutas)
+    if usar_snapshot:
+        datos = cargar_snapshot(directorio, firma)
+        if datos is not None:
+            return datos
+    clientes, eventos, ventas = cargar_csv(directorio, rutas, workers)
+    if usar_snapshot:
+        try:
+            guardar_snapshot(directorio, firma, clientes, eventos, ventas)
+        except OSError as e:
+            print(f"No se pudo guardar el snapshot: {e}")
+    return clientes, eventos, ventas
+
+@metricas.medido("crm.cargar_csv")
+def cargar_csv(directorio, rutas, workers=None):
+    """Lee clientes, eventos y las particiones de ventas `rutas` desde CSV.
 
+    Las particiones se procesan en paralelo en un ProcessPoolExecutor con
+    `workers` procesos (por defecto, uno por núcleo) y se fusionan en el
+    orden de sus nombres, así que el resultado no depende del reparto.
+    """
+    clientes, eventos = {}, {}
+    ventas = VentasStore(eventos)
+    workers = min(workers or os.cpu_count() or 1, len(rutas) or 1)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
     try:
-        with open("data/ventas.csv", newline='') as f:
-            for row in csv.DictReader(f):
-                venta = Venta(**row)
-                ventas.append(venta)
-    except FileNotFoundError:
-        print("Archivo ventas.csv no encontrado.")
+        if pool:
+            partes = pool.map(cargar_particion_ventas, rutas)
+        else:
+            partes = map(cargar_particion_ventas, rutas)
+
+        try:
+            with open(os.path.join(directorio, "clientes.csv"), newline='') as f:
+                for row in csv.DictReader(f):
+                    cliente = Cliente(**row)
+                    clientes[cliente.id] = cliente
+        except FileNotFoundError:
+            print("Archivo clientes.csv no encontrado.")
+
+        try:
+            with open(os.path.join(directorio, "eventos.csv"), newline='') as f:
+                for row in csv.DictReader(f):
+                    evento = Evento(**row)
+                    eventos[evento.id] = evento
+        except FileNotFoundError:
+            print("Archivo eventos.csv no encontrado.")
+
+        if not rutas:
+            print("Archivo ventas.csv no encontrado.")
+        for parte in partes:
+            ventas.fusionar(parte)
+        if metricas.ACTIVO:
+            metricas.contar("crm.filas_leidas", len(clientes) + len(eventos) + len(ventas))
+            metricas.contar("crm.bytes_leidos", sum(metricas.tamano(r) for r in rutas)
+                            + metricas.tamano(os.path.join(directorio, "clientes.csv"))
+                            + metricas.tamano(os.path.join(directorio, "eventos.csv")))
+    finally:
+        if pool:
+            pool.shutdown()
 
     return clientes, eventos, ventas
 
-def guardar_cliente(cliente):
-    with open("data/clientes.csv", "a", newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow([cliente.id, cliente.nombre, cliente.email, cliente.fecha_registro.strftime("%Y-%m-%d")])
+def guardar_cliente(cliente, escritor=None):
+    if escritor is None:
+        with EscritorClientes() as escritor:
+            escritor.agregar(cliente)
+    else:
+        escritor.agregar(cliente)
+        escritor.flush()
 
-def exportar_informe(ventas):
-    ingresos = {}
-    for v in ventas:
-        ingresos[v.evento_id] = ingresos.get(v.evento_id, 0) + v.precio
-    with open("data/informe_resumen.csv", "w", newline='') as f:
+@metricas.medido("crm.exportar_informe")
+def exportar_informe(ventas, path="data/informe_resumen.csv", variante=None, k=10):
+    """Informe de ingresos por evento o, con variante (una clave de RANKINGS), su top-k."""
+    agregados = ventas if isinstance(ventas, AcumuladorVentas) else ventas.agregados
+    if variante is None:
+        cabecera = ["Evento ID", "Ingresos Totales"]
+        filas = agregados.ingresos_por_evento.items()
+    else:
+        cabecera = ["Posición", *RANKINGS[variante]]
+        filas = [(i, clave, valor) for i, (clave, valor) in enumerate(ranking(agregados, variante, k), start=1)]
+    with open(path, "w", newline='') as f:
         writer = csv.writer(f)
-        writer.writerow(["Evento ID", "Ingresos Totales"])
-        for eid, total in ingresos.items():
-            writer.writerow([eid, total])
+        writer.writerow(cabecera)
+        writer.writerows(filas)
+    if metricas.ACTIVO:
+        metricas.contar("crm.bytes_escritos", metricas.tamano(path))
     print("Informe exportado correctamente.")
 
+def mostrar_estadisticas(ventas, eventos, percentiles=False):
+    stats = calcular_estadisticas(ventas, eventos, percentiles)
+
+    print(f"Ingresos totales: {stats['total']}")
+    print("Ingresos por evento:", stats["ingresos_por_evento"])
+    print("Ingresos por categoría:", stats["ingresos_por_categoria"])
+    print("Categorías:", set(stats["ingresos_por_categoria"]))
+    print("Días hasta evento más próximo:", stats["dias_evento_mas_proximo"])
+    print("Resumen precios (min, max, media):", stats["resumen_precios"])
+    if stats["percentiles"]:
+        print("Percentiles de precio:", stats["percentiles"])
+
+def modo_streaming(tam_bloque=TAM_BLOQUE):
+    """Estadísticas e informe directamente desde los CSV, con memoria acotada."""
+    eventos = {}
+    for cabecera, bloque in leer_bloques("data/eventos.csv", tam_bloque):
+        for fila in bloque:
+            evento = Evento(**dict(zip(cabecera, fila)))
+            eventos[evento.id] = evento
+    acumulador = resumir_ventas_csv("data/ventas.csv", eventos, tam_bloque)
+    mostrar_estadisticas(acumulador, eventos)
+    exportar_informe(acumulador)
+
 # -------------------- MENÚ --------------------
 
-def main():
-    clientes, eventos, ventas = {}, {}, []
+def main(ventas_origen=None, workers=None):
+    clientes, eventos, ventas = {}, {}, VentasStore()
+    indice = IndiceRelacional(eventos, ventas)
+    escritor = None
 
     while True:
         print("\n--- MINI CRM DE EVENTOS ---")
@@ -111,12 +999,15 @@ def main():
         print("4. Filtrar ventas por rango de fechas")
         print("5. Estadísticas")
         print("6. Exportar informe")
-        print("7. Salir")
+        print("7. Rankings (top-K)")
+        print("8. Consultas por cliente, evento o categoría")
+        print("9. Salir")
 
         opcion = input("Selecciona una opción: ")
 
         if opcion == "1":
-            clientes, eventos, ventas = cargar_datos()
+            clientes, eventos, ventas = cargar_datos(ventas_origen=ventas_origen, workers=workers)
+            indice = IndiceRelacional(eventos, ventas)
             print("Datos cargados correctamente.")
 
         elif opcion == "2":
@@ -141,10 +1032,12 @@ def main():
             if not fecha_valida:
                 print("Fecha inválida.")
                 continue
-            nuevo_id = str(len(clientes) + 1)
+            if escritor is None:
+                escritor = EscritorClientes()
+            nuevo_id = escritor.siguiente_id()
             cliente = Cliente(nuevo_id, nombre, email, fecha)
             clientes[nuevo_id] = cliente
-            guardar_cliente(cliente)
+            guardar_cliente(cliente, escritor)
             print("Cliente añadido correctamente.")
 
         elif opcion == "4":
@@ -154,40 +1047,79 @@ def main():
             if not d1 or not d2:
                 print("Fechas inválidas.")
                 continue
-            filtradas = [v for v in ventas if d1 <= v.fecha <= d2]
-            for v in filtradas:
+            for v in ventas.filtrar_por_fechas(d1, d2):
                 print(v)
 
         elif opcion == "5":
-            total = sum(v.precio for v in ventas)
-            ingresos_por_evento = {}
-            categorias = set()
-            precios = []
-
-            for v in ventas:
-                ingresos_por_evento[v.evento_id] = ingresos_por_evento.get(v.evento_id, 0) + v.precio
-                precios.append(v.precio)
-                if v.evento_id in eventos:
-                    categorias.add(eventos[v.evento_id].categoria)
-
-            dias_eventos = [e.dias_hasta_evento() for e in eventos.values()]
-            resumen = (min(precios), max(precios), sum(precios)/len(precios)) if precios else (0, 0, 0)
-
-            print(f"Ingresos totales: {total}")
-            print("Ingresos por evento:", ingresos_por_evento)
-            print("Categorías:", categorias)
-            print("Días hasta evento más próximo:", min(dias_eventos))
-            print("Resumen precios (min, max, media):", resumen)
+            percentiles = input("¿Calcular también percentiles de precio? Recorre todas las ventas (s/n): ")
+            mostrar_estadisticas(ventas, eventos, percentiles.strip().lower() == "s")
 
         elif opcion == "6":
             exportar_informe(ventas)
 
         elif opcion == "7":
+            tipo = input(f"Ranking ({'/'.join(RANKINGS)}): ").strip().lower()
+            if tipo not in RANKINGS:
+                print("Ranking inválido.")
+                continue
+            try:
+                k = int(input("¿Cuántos? (por defecto 10): ").strip() or "10")
+            except ValueError:
+                print("Número inválido.")
+                continue
+            for posicion, (clave, valor) in enumerate(ranking(ventas, tipo, k), start=1):
+                print(f"{posicion}. {clave}: {valor}")
+            if input("¿Exportar a CSV? (s/n): ").strip().lower() == "s":
+                exportar_informe(ventas, f"data/informe_top_{tipo}.csv", variante=tipo, k=k)
+
+        elif opcion == "8":
+            tipo = input("Consultar (cliente/evento/categoria): ").strip().lower()
+            clave = input("Id o nombre: ").strip()
+            if tipo == "cliente":
+                for v in ventas.ventas_de_cliente(clave):
+                    print(v)
+                print(f"Gasto total: {indice.gasto_cliente(clave)}")
+            elif tipo == "evento":
+                for v in ventas.ventas_de_evento(clave):
+                    print(v)
+                print("Clientes:", sorted(indice.clientes_de_evento(clave)))
+            elif tipo == "categoria":
+                for e in indice.eventos_de_categoria(clave):
+                    print(e)
+                print(f"Ingresos: {indice.ingresos_categoria(clave)}")
+            else:
+                print("Consulta inválida.")
+
+        elif opcion == "9":
             print("¡Hasta luego!")
             break
 
         else:
             print("Opción inválida.")
 
+def _entero_positivo(texto):
+    try:
+        valor = int(texto)
+    except ValueError:
+        valor = 0
+    if valor < 1:
+        raise argparse.ArgumentTypeError(f"se esperaba un entero >= 1: {texto!r}")
+    return valor
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Mini-CRM de eventos.")
+    parser.add_argument("--streaming", action="store_true", help="estadísticas e informe directamente desde los CSV")
+    parser.add_argument("--importar-clientes", metavar="CSV", help="añade en bloque los clientes de un CSV")
+    parser.add_argument("--ventas", metavar="ORIGEN", default=None,
+                        help="directorio (ventas*.csv) o patrón glob con las particiones de ventas (por defecto data/)")
+    parser.add_argument("--workers", type=_entero_positivo, default=None,
+                        help="procesos para cargar las particiones (por defecto, uno por núcleo)")
+    args = parser.parse_args()
+    if args.streaming:
+        modo_streaming()
+    elif args.importar_clientes:
+        with EscritorClientes(reserva=1000) as escritor:
+            anadidos, rechazados = importar_clientes(args.importar_clientes, escritor)
+        print(f"Clientes importados: {anadidos}. Filas rechazadas: {rechazados}.")
+    else:
+        main(args.ventas, args.workers)
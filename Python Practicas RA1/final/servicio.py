@@ -0,0 +1,229 @@
+"""Modo servicio del Mini-CRM: una API HTTP local sobre asyncio.
+
+Carga los datos una sola vez y los comparte entre todos los operadores:
+
+    GET  /clientes?limite=100&desde=0      listado de clientes
+    GET  /eventos                          listado de eventos
+    GET  /ventas?inicio=YYYY-MM-DD&fin=YYYY-MM-DD&limite=100
+    GET  /estadisticas?percentiles=1         (los percentiles recorren todas las ventas)
+    POST /clientes   {"nombre", "email", "fecha_registro"}
+    POST /informe    exporta data/informe_resumen.csv
+
+Las lecturas se atienden en paralelo; las altas pasan por una única tarea
+escritora que las agrupa en un solo flush; las exportaciones y las
+estadísticas se ejecutan en un pool de hilos para no bloquear el bucle.
+
+Uso: python servicio.py [--host 127.0.0.1] [--puerto 8080]
+"""
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import parse_qs, urlsplit
+
+from practica_final import (Cliente, EscritorClientes, cargar_datos, calcular_estadisticas,
+                            exportar_informe, validar_email, validar_fecha)
+
+LIMITE_POR_DEFECTO = 100
+TAM_MAX_CUERPO = 1 << 20
+ESTADOS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+class ErrorHTTP(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+def cliente_a_dict(c):
+    return {"id": c.id, "nombre": c.nombre, "email": c.email, "fecha_registro": c.fecha_registro.strftime("%Y-%m-%d")}
+
+def evento_a_dict(e):
+    return {"id": e.id, "nombre": e.nombre, "categoria": e.categoria, "fecha": e.fecha.strftime("%Y-%m-%d"), "precio": e.precio}
+
+def venta_a_dict(v):
+    return {"id": v.id, "cliente_id": v.cliente_id, "evento_id": v.evento_id,
+            "fecha": v.fecha.strftime("%Y-%m-%d"), "precio": v.precio}
+
+def _entero(params, nombre, defecto):
+    try:
+        return max(0, int(params.get(nombre, [defecto])[0]))
+    except ValueError:
+        raise ErrorHTTP(400, f"'{nombre}' debe ser un entero")
+
+def _pagina(iterable, params):
+    desde = _entero(params, "desde", 0)
+    limite = _entero(params, "limite", LIMITE_POR_DEFECTO)
+    return list(islice(iterable, desde, desde + limite))
+
+class ServicioCRM:
+    def __init__(self, workers=4):
+        self.clientes, self.eventos, self.ventas = cargar_datos()
+        # los flush los decide _escritora, uno por lote: nunca automáticos dentro de agregar()
+        self.escritor = EscritorClientes(tam_lote=float("inf"))
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.altas = asyncio.Queue()
+        # todas las exportaciones escriben el mismo archivo: de una en una
+        self.bloqueo_informe = asyncio.Lock()
+        self._tarea_escritora = None
+
+    async def iniciar(self):
+        self._tarea_escritora = asyncio.create_task(self._escritora())
+
+    async def detener(self):
+        if self._tarea_escritora:
+            self._tarea_escritora.cancel()
+        await asyncio.get_running_loop().run_in_executor(self.pool, self.escritor.cerrar)
+        self.pool.shutdown()
+
+    async def _escritora(self):
+        """Única tarea que modifica clientes: agrupa las altas pendientes y hace un solo flush.
+
+        Si un lote falla se descartan sus filas y solo fallan sus altas; la
+        tarea sigue atendiendo los lotes siguientes.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self.altas.get()]
+            while not self.altas.empty():
+                lote.append(self.altas.get_nowait())
+            try:
+                clientes = await loop.run_in_executor(self.pool, self._guardar_lote, [datos for datos, _ in lote])
+            except Exception as e:
+                for _, futuro in lote:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+            for cliente, (_, futuro) in zip(clientes, lote):
+                self.clientes[cliente.id] = cliente
+                if not futuro.done():
+                    futuro.set_result(cliente)
+
+    def _guardar_lote(self, lote):
+        """En el pool: reserva los ids del lote y lo guarda, con un cerrojo y un fsync para cada cosa."""
+        try:
+            self.escritor.reservar(len(lote))
+            clientes = [Cliente(self.escritor.siguiente_id(), d["nombre"], d["email"], d["fecha_registro"]) for d in lote]
+            for cliente in clientes:
+                self.escritor.agregar(cliente)
+            self.escritor.flush()
+        except Exception:
+            self.escritor.descartar()
+            raise
+        return clientes
+
+    async def alta_cliente(self, datos):
+        nombre = str(datos.get("nombre", "")).strip()
+        email = str(datos.get("email", ""))
+        fecha = str(datos.get("fecha_registro", ""))
+        if not nombre:
+            raise ErrorHTTP(400, "Nombre obligatorio.")
+        if not validar_email(email):
+            raise ErrorHTTP(400, "Email inválido.")
+        if not validar_fecha(fecha):
+            raise ErrorHTTP(400, "Fecha inválida.")
+        futuro = asyncio.get_running_loop().create_future()
+        await self.altas.put(({"nombre": nombre, "email": email, "fecha_registro": fecha}, futuro))
+        return cliente_a_dict(await futuro)
+
+    async def atender(self, metodo, ruta, params, cuerpo):
+        loop = asyncio.get_running_loop()
+        if ruta == "/clientes" and metodo == "GET":
+            return 200, [cliente_a_dict(c) for c in _pagina(self.clientes.values(), params)]
+        if ruta == "/clientes" and metodo == "POST":
+            try:
+                datos = json.loads(cuerpo or b"{}")
+            except ValueError:
+                raise ErrorHTTP(400, "JSON inválido.")
+            if not isinstance(datos, dict):
+                raise ErrorHTTP(400, "Se esperaba un objeto JSON.")
+            return 201, await self.alta_cliente(datos)
+        if ruta == "/eventos" and metodo == "GET":
+            return 200, [evento_a_dict(e) for e in _pagina(self.eventos.values(), params)]
+        if ruta == "/ventas" and metodo == "GET":
+            if "inicio" in params or "fin" in params:
+                d1 = validar_fecha(params.get("inicio", [""])[0])
+                d2 = validar_fecha(params.get("fin", [""])[0])
+                if not d1 or not d2:
+                    raise ErrorHTTP(400, "Fechas inválidas.")
+                ventas = self.ventas.filtrar_por_fechas(d1, d2)
+            else:
+                ventas = iter(self.ventas)
+            return 200, [venta_a_dict(v) for v in _pagina(ventas, params)]
+        if ruta == "/estadisticas" and metodo == "GET":
+            percentiles = params.get("percentiles", ["0"])[0] not in ("", "0")
+            stats = await loop.run_in_executor(self.pool, calcular_estadisticas, self.ventas, self.eventos, percentiles)
+            return 200, stats
+        if ruta == "/informe" and metodo == "POST":
+            async with self.bloqueo_informe:
+                await loop.run_in_executor(self.pool, exportar_informe, self.ventas)
+            return 200, {"informe": "data/informe_resumen.csv"}
+        if ruta in ("/clientes", "/eventos", "/ventas", "/estadisticas", "/informe"):
+            raise ErrorHTTP(405, "Método no permitido.")
+        raise ErrorHTTP(404, "Ruta no encontrada.")
+
+    async def conexion(self, reader, writer):
+        try:
+            estado, respuesta = await self._procesar(reader)
+        except ErrorHTTP as e:
+            estado, respuesta = e.estado, {"error": str(e)}
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as e:
+            estado, respuesta = 500, {"error": str(e)}
+        cuerpo = json.dumps(respuesta, ensure_ascii=False, default=list).encode("utf-8")
+        writer.write(f"HTTP/1.1 {estado} {ESTADOS.get(estado, '')}\r\n"
+                     f"Content-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(cuerpo)}\r\nConnection: close\r\n\r\n".encode("ascii") + cuerpo)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _procesar(self, reader):
+        linea = (await reader.readline()).decode("latin-1").split()
+        if len(linea) < 2:
+            raise ErrorHTTP(400, "Petición mal formada.")
+        metodo, destino = linea[0].upper(), linea[1]
+        cabeceras = {}
+        while True:
+            cabecera = (await reader.readline()).decode("latin-1").strip()
+            if not cabecera:
+                break
+            nombre, _, valor = cabecera.partition(":")
+            cabeceras[nombre.strip().lower()] = valor.strip()
+        try:
+            longitud = int(cabeceras.get("content-length", 0))
+        except ValueError:
+            raise ErrorHTTP(400, "Content-Length inválido.")
+        if longitud > TAM_MAX_CUERPO:
+            raise ErrorHTTP(413, "Cuerpo demasiado grande.")
+        cuerpo = await reader.readexactly(longitud) if longitud else b""
+        url = urlsplit(destino)
+        return await self.atender(metodo, url.path.rstrip("/") or "/", parse_qs(url.query), cuerpo)
+
+async def servir(host, puerto, workers):
+    servicio = ServicioCRM(workers)
+    await servicio.iniciar()
+    servidor = await asyncio.start_server(servicio.conexion, host, puerto)
+    print(f"Mini-CRM escuchando en http://{host}:{puerto}")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        await servicio.detener()
+
+def main():
+    parser = argparse.ArgumentParser(description="Mini-CRM como servicio HTTP local.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=4, help="hilos para exportaciones y estadísticas")
+    args = parser.parse_args()
+    try:
+        asyncio.run(servir(args.host, args.puerto, args.workers))
+    except KeyboardInterrupt:
+        print("Servicio detenido.")
+
+if __name__ == "__main__":
+    main()
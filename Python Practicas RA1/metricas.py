@@ -0,0 +1,115 @@
+"""Instrumentación ligera compartida por final/, practica2/ y practica3/.
+
+Se activa con variables de entorno; desactivada, `medido` devuelve la
+función sin envolver y `etapa`/`contar` no hacen nada:
+
+    RA1_METRICAS=1            activa tiempos por etapa y contadores
+    RA1_METRICAS_JSON=ruta    dónde volcar las métricas al salir (por defecto metricas.json)
+    RA1_PERFIL=ruta           perfila toda la ejecución con cProfile; guarda
+                              los datos en `ruta` y un informe de texto en `ruta`.txt
+"""
+import atexit
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import pstats
+import time
+from typing import Callable, Dict, List
+
+ACTIVO = os.environ.get("RA1_METRICAS", "") not in ("", "0")
+RUTA_JSON = os.environ.get("RA1_METRICAS_JSON", "metricas.json")
+RUTA_PERFIL = os.environ.get("RA1_PERFIL", "")
+
+_inicio = time.time()
+_contadores: Dict[str, int] = {}
+# nombre de etapa -> [llamadas, segundos totales, segundos máximo]
+_etapas: Dict[str, List[float]] = {}
+
+def _registrar(nombre: str, segundos: float) -> None:
+    datos = _etapas.get(nombre)
+    if datos is None:
+        _etapas[nombre] = [1, segundos, segundos]
+    else:
+        datos[0] += 1
+        datos[1] += segundos
+        if segundos > datos[2]:
+            datos[2] = segundos
+
+if ACTIVO:
+    def contar(nombre: str, n: int = 1) -> None:
+        _contadores[nombre] = _contadores.get(nombre, 0) + n
+
+    @contextlib.contextmanager
+    def etapa(nombre: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            _registrar(nombre, time.perf_counter() - t0)
+
+    def medido(nombre: str) -> Callable:
+        def decorador(funcion):
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                t0 = time.perf_counter()
+                try:
+                    return funcion(*args, **kwargs)
+                finally:
+                    _registrar(nombre, time.perf_counter() - t0)
+            return envoltura
+        return decorador
+else:
+    _NULO = contextlib.nullcontext()
+
+    def contar(nombre: str, n: int = 1) -> None:
+        pass
+
+    def etapa(nombre: str):
+        return _NULO
+
+    def medido(nombre: str) -> Callable:
+        return lambda funcion: funcion
+
+def tamano(path: str) -> int:
+    """Tamaño de un archivo en bytes (0 si no existe); pensado para los contadores de bytes."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def resumen() -> dict:
+    return {
+        "inicio": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(_inicio)),
+        "duracion_s": round(time.time() - _inicio, 6),
+        "pid": os.getpid(),
+        "etapas": {nombre: {"llamadas": int(n), "total_s": round(total, 6), "max_s": round(maximo, 6)}
+                   for nombre, (n, total, maximo) in sorted(_etapas.items())},
+        "contadores": dict(sorted(_contadores.items())),
+    }
+
+def volcar(ruta: str = RUTA_JSON) -> None:
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(resumen(), f, indent=2, ensure_ascii=False)
+
+_pid_inicial = os.getpid()
+
+def _al_salir() -> None:
+    # los procesos hijos de un pool no deben pisar el volcado del proceso principal
+    if os.getpid() != _pid_inicial:
+        return
+    if _perfil is not None:
+        _perfil.disable()
+        _perfil.dump_stats(RUTA_PERFIL)
+        with open(RUTA_PERFIL + ".txt", "w", encoding="utf-8") as f:
+            pstats.Stats(_perfil, stream=f).sort_stats("cumulative").print_stats(40)
+    if ACTIVO and (_etapas or _contadores):
+        volcar()
+
+_perfil = None
+if RUTA_PERFIL:
+    _perfil = cProfile.Profile()
+    _perfil.enable()
+if ACTIVO or RUTA_PERFIL:
+    atexit.register(_al_salir)
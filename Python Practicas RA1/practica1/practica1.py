@@ -1,37 +1,119 @@
-empleados = int(input("Introduce num. empleados: "))
-hora_referencia = int(input("Hora de referencia (0-23): "))
+import argparse
+import csv
+import sys
 
-cont = 0
-contador_entradas = 0
-salida_mas_temprana = 0
-nombre_salida_temprana = ""
-
-while cont < empleados:
-    nombre_empleado = input("\nIntroduce nombre empleado: ")
-    hora_entrada = int(input("Hora de entrada (0-23): "))
-    hora_salida = int(input("Hora de salida (0-23): "))
 
+def validar_horas(hora_entrada, hora_salida):
+    """Devuelve el mensaje de error, o None si las horas son válidas."""
     if hora_entrada < 0 or hora_entrada > 23 or hora_salida < 0 or hora_salida > 23 :
-        print("Error: Las horas deben estar entre 0 y 23")
-        continue
+        return "Error: Las horas deben estar entre 0 y 23"
     elif hora_salida <= hora_entrada :
-        print("Error: La hora de salida debe ser mayor que la de entrada")
-        continue
+        return "Error: La hora de salida debe ser mayor que la de entrada"
+    return None
+
+
+class Resultado:
+    """Acumula en una pasada el recuento de entradas y la salida más temprana."""
+
+    def __init__(self, hora_referencia):
+        self.hora_referencia = hora_referencia
+        self.contador_entradas = 0
+        self.salida_mas_temprana = 0
+        self.nombre_salida_temprana = ""
+        self.rechazados = 0
+
+    def agregar(self, nombre_empleado, hora_entrada, hora_salida):
+        if hora_entrada <= self.hora_referencia :
+            self.contador_entradas += 1
+        if self.nombre_salida_temprana == "" or hora_salida < self.salida_mas_temprana :
+            self.salida_mas_temprana = hora_salida
+            self.nombre_salida_temprana = nombre_empleado
+
+    def mostrar(self):
+        print("\nResultado >")
+        print("Empleados que entraron antes o a la hora de referencia:", self.contador_entradas)
+        if self.nombre_salida_temprana != "" :
+            print("El empleado", self.nombre_salida_temprana, "ha salido antes a las", self.salida_mas_temprana)
+        else :
+            print("No se registro ninguna salida valida.")
+
+
+def leer_fichajes(f):
+    """Genera (nombre, entrada, salida) por cada línea 'nombre;entrada;salida' (o con comas).
+
+    Las líneas que no se pueden convertir generan None. Una primera línea
+    de cabecera (con 'entrada') se salta.
+    """
+    primera = f.readline()
+    delimitador = ";" if ";" in primera else ","
+    lineas = f if "entrada" in primera.lower() else _con_primera(primera, f)
+    for fila in csv.reader(lineas, delimiter=delimitador):
+        if not fila:
+            continue
+        try:
+            nombre, hora_entrada, hora_salida = fila
+            yield nombre.strip(), int(hora_entrada), int(hora_salida)
+        except ValueError:
+            yield None
+
+
+def _con_primera(primera, f):
+    yield primera
+    yield from f
+
+
+def evaluar_lote(f, hora_referencia):
+    """Procesa todos los fichajes de f en una pasada y con memoria constante."""
+    resultado = Resultado(hora_referencia)
+    for fichaje in leer_fichajes(f):
+        if fichaje is None or validar_horas(fichaje[1], fichaje[2]) :
+            resultado.rechazados += 1
+            continue
+        resultado.agregar(*fichaje)
+    return resultado
+
+
+def modo_interactivo():
+    empleados = int(input("Introduce num. empleados: "))
+    hora_referencia = int(input("Hora de referencia (0-23): "))
+    resultado = Resultado(hora_referencia)
+
+    cont = 0
+    while cont < empleados:
+        nombre_empleado = input("\nIntroduce nombre empleado: ")
+        hora_entrada = int(input("Hora de entrada (0-23): "))
+        hora_salida = int(input("Hora de salida (0-23): "))
+
+        error = validar_horas(hora_entrada, hora_salida)
+        if error :
+            print(error)
+            continue
+
+        resultado.agregar(nombre_empleado, hora_entrada, hora_salida)
+        cont += 1
+
+    resultado.mostrar()
 
-    if hora_entrada <= hora_referencia :
-        contador_entradas += 1
 
-    if hora_salida >= hora_referencia :
-        salida_mas_temprana = hora_salida
-        nombre_salida_temprana = nombre_empleado
+def main():
+    parser = argparse.ArgumentParser(description="Evaluación de horas de entrada y salida.")
+    parser.add_argument("fichero", nargs="?", help="fichajes 'nombre;entrada;salida' ('-' para stdin); sin él, modo interactivo")
+    parser.add_argument("--hora", type=int, default=None, help="hora de referencia (0-23)")
+    args = parser.parse_args()
 
-    cont += 1
+    if args.fichero is None:
+        modo_interactivo()
+        return
+    if args.hora is None or not 0 <= args.hora <= 23:
+        parser.error("en modo lote hay que indicar --hora entre 0 y 23")
+    if args.fichero == "-":
+        resultado = evaluar_lote(sys.stdin, args.hora)
+    else:
+        with open(args.fichero, newline="", encoding="utf-8") as f:
+            resultado = evaluar_lote(f, args.hora)
+    resultado.mostrar()
+    print("Registros rechazados:", resultado.rechazados)
 
-print("\nResultado >")
-print("Empleados que entraron antes o a la hora de referencia:", contador_entradas)
-if nombre_salida_temprana != "" :
-    print("El empleado", nombre_salida_temprana, "ha salido antes a las", salida_mas_temprana)
-else :
-     print("No se registro ninguna salida valida.")
 
-    
\ No newline at end of file
+if __name__ == "__main__":
+    main()
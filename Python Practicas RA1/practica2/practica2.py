@@ -1,13 +1,24 @@
 import csv
+import gzip
+import io
 import json
 import os
-import shutil
-from typing import List
+import sys
+from itertools import accumulate, chain
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import metricas  # noqa: E402
 
 class RegistroHorario:
+    # Sin __dict__ por instancia; nombres y días internados para que las
+    # repeticiones compartan el mismo objeto str.
+    __slots__ = ('empleado', 'dia', 'entrada', 'salida')
+
     def __init__(self, empleado: str, dia: str, entrada: int, salida: int):
-        self.empleado = empleado
-        self.dia = dia
+        self.empleado = sys.intern(empleado)
+        self.dia = sys.intern(dia)
         self.entrada = entrada
         self.salida = salida
 
@@ -24,75 +35,307 @@ class RegistroHorario:
             'duracion': self.duracion()
         }
 
+class IndiceOcupacion:
+    """Histogramas de 24 franjas de horas de entrada y salida, por día y en total.
+
+    Con las sumas acumuladas responde en O(1) cuántos han llegado, siguen
+    presentes o se han ido a una hora H. Las horas fuera de 0-23 se
+    guardan en una franja extra (las negativas cuentan como hora 0).
+    """
+    FRANJAS = 24
+
+    def __init__(self, registros_iniciales=()):
+        self.entradas: Dict[Optional[str], List[int]] = {}
+        self.salidas: Dict[Optional[str], List[int]] = {}
+        self._acumulados: Dict[Optional[str], Tuple[List[int], List[int]]] = {}
+        for r in registros_iniciales:
+            self.agregar(r.dia, r.entrada, r.salida)
+
+    @classmethod
+    def _franja(cls, hora: int) -> int:
+        return min(max(hora, 0), cls.FRANJAS)
+
+    def agregar(self, dia: Optional[str], entrada: int, salida: int) -> None:
+        e, s = self._franja(entrada), self._franja(salida)
+        for clave in (None, dia) if dia is not None else (None,):
+            self.entradas.setdefault(clave, [0] * (self.FRANJAS + 1))[e] += 1
+            self.salidas.setdefault(clave, [0] * (self.FRANJAS + 1))[s] += 1
+            self._acumulados.pop(clave, None)
+
+    def _prefijos(self, dia: Optional[str]) -> Tuple[List[int], List[int]]:
+        acumulados = self._acumulados.get(dia)
+        if acumulados is None:
+            vacio = [0] * (self.FRANJAS + 1)
+            acumulados = (list(accumulate(self.entradas.get(dia, vacio))),
+                          list(accumulate(self.salidas.get(dia, vacio))))
+            self._acumulados[dia] = acumulados
+        return acumulados
+
+    def llegados(self, hora: int, dia: Optional[str] = None) -> int:
+        """Registros con entrada <= hora (0-23)."""
+        return self._prefijos(dia)[0][hora]
+
+    def salidos(self, hora: int, dia: Optional[str] = None) -> int:
+        """Registros con salida <= hora (0-23)."""
+        return self._prefijos(dia)[1][hora]
+
+    def presentes(self, hora: int, dia: Optional[str] = None) -> int:
+        """Registros que han entrado y aún no han salido a esa hora."""
+        entradas, salidas = self._prefijos(dia)
+        return entradas[hora] - salidas[hora]
+
 CSV_PATH = 'horarios.csv'
 registros: List[RegistroHorario] = []
 
-def leer_csv(path: str) -> List[RegistroHorario]:
+# Nombres de columna aceptados para cada campo, por orden de preferencia
+ALIAS_COLUMNAS = {
+    'empleado': ('empleado', 'nombre', 'nombre_empleado'),
+    'dia': ('dia',),
+    'entrada': ('entrada', 'h_entrada', 'hora_entrada'),
+    'salida': ('salida', 'h_salida', 'hora_salida'),
+}
+_TODOS_LOS_ALIAS = {a for alias in ALIAS_COLUMNAS.values() for a in alias}
+
+def resolver_cabecera(fila: List[str]) -> Optional[List[Optional[int]]]:
+    """Si la fila es una cabecera, devuelve el índice de cada campo (None si falta); si no, None."""
+    nombres = [c.strip().lower() for c in fila]
+    if not any(n in _TODOS_LOS_ALIAS for n in nombres):
+        return None
+    return [next((nombres.index(a) for a in alias if a in nombres), None) for alias in ALIAS_COLUMNAS.values()]
+
+@metricas.medido('practica2.leer_csv')
+def leer_csv(path: str, rechazadas: Optional[List[Tuple[int, List[str]]]] = None) -> List[RegistroHorario]:
+    """Lee un CSV de horarios separado por ';', con o sin cabecera.
+
+    La cabecera se resuelve una sola vez a posiciones de columna y las filas
+    se decodifican por posición. Las filas que no se pueden convertir se
+    cuentan y, si se pasa la lista `rechazadas`, se añaden como (nº fila, fila).
+    """
     registros_local: List[RegistroHorario] = []
+    n_rechazadas = 0
     try:
         with open(path, newline='', encoding='utf-8') as f:
-            first_line = f.readline()
-            f.seek(0)
-            has_header = ',' in first_line or ';' in first_line and any(h.lower() in first_line.lower() for h in ['empleado','nombre','dia','entrada','salida'])
-            if has_header:
-                lector = csv.DictReader(f, delimiter=';', quotechar='"')
-                for fila in lector:
-                    try:
-                        nombre = fila.get('empleado') or fila.get('nombre') or fila.get('nombre_empleado') or ''
-                        dia = fila.get('dia') or ''
-                        entrada = int(fila.get('entrada') or fila.get('h_entrada') or fila.get('hora_entrada') or 0)
-                        salida = int(fila.get('salida') or fila.get('h_salida') or fila.get('hora_salida') or 0)
-                    except (ValueError, TypeError):
-                        continue
-                    registros_local.append(RegistroHorario(nombre, dia, entrada, salida))
+            lector = csv.reader(f, delimiter=';', quotechar='"')
+            primera = next(lector, None)
+            if primera is None:
+                return registros_local
+            columnas = resolver_cabecera(primera)
+            if columnas is None:
+                filas = chain([primera], lector)
+                inicio = 1
             else:
-                lector = csv.reader(f, delimiter=';', quotechar='"')
-                for fila in lector:
-                    if not fila:
-                        continue
-                    try:
+                filas = lector
+                inicio = 2
+            completas = columnas is not None and None not in columnas
+            if completas:
+                extraer = itemgetter(*columnas)
+                ancho = max(columnas) + 1
+            agregar = registros_local.append
+            for num, fila in enumerate(filas, start=inicio):
+                if not fila:
+                    continue
+                try:
+                    if columnas is None:
                         nombre, dia, h_entrada, h_salida = fila
                         entrada = int(h_entrada)
                         salida = int(h_salida)
-                    except ValueError:
-                        continue
-                    registros_local.append(RegistroHorario(nombre, dia, entrada, salida))
+                    else:
+                        if completas and len(fila) >= ancho:
+                            nombre, dia, h_entrada, h_salida = extraer(fila)
+                        else:
+                            nombre, dia, h_entrada, h_salida = (
+                                fila[i] if i is not None and i < len(fila) else '' for i in columnas)
+                        entrada = int(h_entrada or 0)
+                        salida = int(h_salida or 0)
+                except ValueError:
+                    n_rechazadas += 1
+                    if rechazadas is not None:
+                        rechazadas.append((num, fila))
+                    continue
+                agregar(RegistroHorario(nombre, dia, entrada, salida))
     except FileNotFoundError:
         print(f"Advertencia: no se encontró el archivo {path}. Empezando con lista vacía.")
     except IOError as e:
         print(f"Error de E/S al leer {path}: {e}")
+    if n_rechazadas:
+        print(f"Advertencia: {n_rechazadas} filas rechazadas en {path}")
+    if metricas.ACTIVO:
+        metricas.contar('practica2.filas_leidas', len(registros_local) + n_rechazadas)
+        metricas.contar('practica2.filas_rechazadas', n_rechazadas)
+        metricas.contar('practica2.bytes_leidos', metricas.tamano(path))
     return registros_local
 
-def guardar_csv(path: str, registros_list: List[RegistroHorario]) -> None:
-    """Sobrescribe un CSV con los registros actuales"""
+CAMPOS_CSV = ['empleado', 'dia', 'entrada', 'salida']
+
+# ruta absoluta -> (nº de registros guardados, último registro guardado, (mtime_ns, tamaño) tras guardar)
+_estado_guardado: Dict[str, Tuple[int, Optional[RegistroHorario], Tuple[int, int]]] = {}
+
+def _firma(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def _termina_en_salto(path: str) -> bool:
+    """True si el último byte del archivo es '\n' (se puede añadir filas sin pegarlas a la última)."""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+    except OSError:
+        return False
+
+def _fsync_directorio(path: str) -> None:
+    """Hace duradero el rename en POSIX; en Windows no se puede abrir un directorio."""
+    if os.name == 'nt':
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _escribir_filas(f, registros_list: Iterable[RegistroHorario], cabecera: bool) -> None:
+    escritor = csv.writer(f, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+    if cabecera:
+        escritor.writerow(CAMPOS_CSV)
+    escritor.writerows([r.empleado, r.dia, r.entrada, r.salida] for r in registros_list)
+    f.flush()
+    os.fsync(f.fileno())
+
+def registrar_guardado(path: str, registros_list: List[RegistroHorario]) -> None:
+    """Marca registros_list como ya presente en path (p. ej. justo después de leerlo).
+
+    Solo se registra si el archivo tiene exactamente la cabecera que escribe
+    guardar_csv y termina en salto de línea; si no, el siguiente guardado
+    lo reescribirá entero.
+    """
+    try:
+        with open(path, newline='', encoding='utf-8') as f:
+            cabecera = next(csv.reader(f, delimiter=';', quotechar='"'), None)
+    except OSError:
+        return
+    firma = _firma(path)
+    if cabecera == CAMPOS_CSV and firma is not None and _termina_en_salto(path):
+        _estado_guardado[os.path.abspath(path)] = (len(registros_list), registros_list[-1] if registros_list else None, firma)
+
+@metricas.medido('practica2.guardar_csv')
+def guardar_csv(path: str, registros_list: List[RegistroHorario], completo: bool = False) -> None:
+    """Guarda los registros en un CSV de forma duradera.
+
+    Si el archivo no ha cambiado desde el último guardado y la lista solo
+    ha crecido por el final, se añaden únicamente los registros nuevos. Si
+    no (o con completo=True, p. ej. tras editar registros) se reescribe en
+    un .tmp con fsync y se sustituye de forma atómica con os.replace.
+    """
+    clave = os.path.abspath(path)
+    estado = _estado_guardado.pop(clave, None)
+    if estado is not None and not completo:
+        n, ultimo, firma = estado
+        if (n <= len(registros_list) and (n == 0 or registros_list[n - 1] is ultimo)
+                and _firma(path) == firma and _termina_en_salto(path)):
+            try:
+                if n < len(registros_list):
+                    with open(path, 'a', newline='', encoding='utf-8') as f:
+                        _escribir_filas(f, registros_list[n:], cabecera=False)
+                _estado_guardado[clave] = (len(registros_list), registros_list[-1] if registros_list else None, _firma(path))
+                if metricas.ACTIVO:
+                    metricas.contar('practica2.guardados_incrementales')
+                    metricas.contar('practica2.bytes_escritos', _estado_guardado[clave][2][1] - firma[1])
+                return
+            except IOError as e:
+                print(f"Error al añadir al CSV, se reescribirá completo: {e}")
     tmp = path + '.tmp'
     try:
         with open(tmp, 'w', newline='', encoding='utf-8') as f:
-            campos = ['empleado','dia','entrada','salida']
-            escritor = csv.DictWriter(f, fieldnames=campos, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-            escritor.writeheader()
-            for r in registros_list:
-                escritor.writerow({
-                    'empleado': r.empleado,
-                    'dia': r.dia,
-                    'entrada': r.entrada,
-                    'salida': r.salida
-                })
-        shutil.move(tmp, path)
+            _escribir_filas(f, registros_list, cabecera=True)
+        os.replace(tmp, path)
+        _fsync_directorio(path)
+        _estado_guardado[clave] = (len(registros_list), registros_list[-1] if registros_list else None, _firma(path))
+        if metricas.ACTIVO:
+            metricas.contar('practica2.guardados_completos')
+            metricas.contar('practica2.bytes_escritos', metricas.tamano(path))
     except IOError as e:
         print(f"Error al guardar CSV: {e}")
         if os.path.exists(tmp):
             os.remove(tmp)
 
-def exportar_json(path: str, registros_list: List[RegistroHorario]) -> None:
-    datos = [r.to_dict() for r in registros_list]
+TAM_BUFFER_JSON = 1 << 20
+REGISTROS_POR_ESCRITURA = 1000
+
+def _linea_json(r: RegistroHorario, cadenas: Dict[str, str]) -> str:
+    """Serializa un registro igual que json.dumps(r.to_dict(), ensure_ascii=False).
+
+    Nombres y días se repiten mucho, así que su forma escapada se guarda en `cadenas`.
+    """
+    empleado = cadenas.get(r.empleado)
+    if empleado is None:
+        empleado = cadenas[r.empleado] = json.dumps(r.empleado, ensure_ascii=False)
+    dia = cadenas.get(r.dia)
+    if dia is None:
+        dia = cadenas[r.dia] = json.dumps(r.dia, ensure_ascii=False)
+    return (f'{{"empleado": {empleado}, "dia": {dia}, "entrada": {r.entrada:d}, '
+            f'"salida": {r.salida:d}, "duracion": {r.duracion():d}}}')
+
+def _abrir_salida(path: str, comprimir: bool, buffer: int):
+    if comprimir:
+        return io.TextIOWrapper(io.BufferedWriter(gzip.GzipFile(path, 'wb', compresslevel=6), buffer_size=buffer), encoding='utf-8')
+    return open(path, 'w', encoding='utf-8', buffering=buffer)
+
+@metricas.medido('practica2.exportar_json')
+def exportar_json(path: str, registros_list: Iterable[RegistroHorario], formato: str = 'json',
+                  buffer: int = TAM_BUFFER_JSON, comprimir: Optional[bool] = None) -> None:
+    """Exporta los registros a medida que se recorren, sin construir la lista de dicts.
+
+    formato='json' escribe un array con un registro por línea y 'ndjson' un
+    objeto JSON por línea. Con comprimir=True (o una ruta .gz) la salida va
+    comprimida con gzip.
+    """
+    if formato not in ('json', 'ndjson'):
+        raise ValueError(f"Formato no soportado: {formato}")
+    if comprimir is None:
+        comprimir = path.endswith('.gz')
+    separador = '\n' if formato == 'ndjson' else ',\n'
+    cadenas: Dict[str, str] = {}
     try:
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(datos, f, indent=4, ensure_ascii=False)
+        with _abrir_salida(path, comprimir, buffer) as f:
+            escritos = 0
+            lote: List[str] = []
+
+            def volcar():
+                nonlocal escritos
+                if escritos:
+                    f.write(separador)
+                elif formato == 'json':
+                    f.write('[\n')
+                f.write(separador.join(lote))
+                escritos += len(lote)
+                lote.clear()
+
+            for r in registros_list:
+                lote.append(_linea_json(r, cadenas))
+                if len(lote) >= REGISTROS_POR_ESCRITURA:
+                    volcar()
+            if lote:
+                volcar()
+            if formato == 'json':
+                f.write('\n]' if escritos else '[]')
+            elif escritos:
+                f.write('\n')
     except IOError as e:
         print(f"Error al guardar JSON: {e}")
+        return
+    if metricas.ACTIVO:
+        metricas.contar('practica2.registros_exportados', escritos)
+        metricas.contar('practica2.bytes_escritos', metricas.tamano(path))
 
 registros = leer_csv(CSV_PATH)
+registrar_guardado(CSV_PATH, registros)
+indice_registros = IndiceOcupacion(registros)
 print(f"Se han leído {len(registros)} registros desde {CSV_PATH}")
 
 horarios = {
@@ -104,6 +347,17 @@ horarios = {
     'Raúl':   ('12', '20'),
 }
 
+def _indexar_horarios() -> IndiceOcupacion:
+    indice = IndiceOcupacion()
+    for entrada, salida in horarios.values():
+        try:
+            indice.agregar(None, int(entrada), int(salida))
+        except ValueError:
+            continue
+    return indice
+
+indice_horarios = _indexar_horarios()
+
 def mostrar_registros():
     """Muestra primero los registros leídos desde CSV y luego el diccionario estático"""
     print("Registros leídos desde CSV:")
@@ -123,18 +377,16 @@ def contar_entradas():
     except ValueError:
         print("Hora no válida.")
         return
+    if not 0 <= hora <= 23:
+        print("Hora no válida.")
+        return
 
-    cont = 0
-    for nombre, (entrada, _) in horarios.items():
-        try:
-            if int(entrada) <= hora:
-                cont += 1
-        except ValueError:
-            continue
-
-    cont_registros = sum(1 for r in registros if r.entrada <= hora)
+    cont = indice_horarios.llegados(hora)
+    cont_registros = indice_registros.llegados(hora)
     print(f"\n{cont} empleados (diccionario estático) han llegado antes o a las {hora}h")
     print(f"{cont_registros} registros (CSV) tienen entrada <= {hora}h")
+    print(f"{indice_registros.presentes(hora)} registros (CSV) siguen presentes a las {hora}h")
+    print(f"{indice_registros.salidos(hora)} registros (CSV) han salido a las {hora}h o antes")
 
 def anadir_registro_interactivo():
     nombre = input("Empleado: ").strip()
@@ -150,6 +402,7 @@ def anadir_registro_interactivo():
         return
     nuevo = RegistroHorario(nombre, dia, entrada, salida)
     registros.append(nuevo)
+    indice_registros.agregar(nuevo.dia, nuevo.entrada, nuevo.salida)
     print("Registro añadido en memoria. Para persistir llame a 'guardar' desde el menú.")
 
 def eliminar_archivo(path: str):
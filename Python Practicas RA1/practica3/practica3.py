@@ -1,99 +1,322 @@
 import csv
 import os
-from typing import List, Dict, Set
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, repeat
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import metricas  # noqa: E402
+
+TAM_BUFFER = 1 << 20
 
 class RegistroHorario:
+    # sin __dict__ y con nombres/días internados: las repeticiones comparten el mismo str
+    __slots__ = ('empleado', 'dia', 'entrada', 'salida')
     def __init__(self, empleado: str, dia: str, entrada: int, salida: int):
-        self.empleado = empleado.strip()
-        self.dia = dia.strip()
+        self.empleado = sys.intern(empleado.strip())
+        self.dia = sys.intern(dia.strip())
         self.entrada = int(entrada)
         self.salida = int(salida)
     def duracion(self) -> int:
         return self.salida - self.entrada
 
+def _mapa_posiciones(lista: list) -> dict:
+    """elemento -> posición; se construye solo al primer borrado para no pagarlo en cada carga."""
+    posiciones = {elem: i for i, elem in enumerate(lista)}
+    if len(posiciones) != len(lista):
+        raise ValueError("Hay registros repetidos: no se pueden indexar por posición")
+    return posiciones
+
+def _quitar_en_o1(lista: list, posiciones: dict, elem) -> None:
+    """Quita elem de lista en O(1) moviendo el último a su hueco (no conserva el orden)."""
+    i = posiciones.pop(elem)
+    ultimo = lista.pop()
+    if ultimo is not elem:
+        lista[i] = ultimo
+        posiciones[ultimo] = i
+
 class Empleado:
     def __init__(self, nombre: str):
         self.nombre = nombre
         self.registros: List[RegistroHorario] = []
+        # registro -> posición en self.registros; None hasta el primer borrado
+        self._posicion: Optional[Dict[RegistroHorario, int]] = None
+        self._horas = 0
+        self._registros_por_dia: Dict[str, int] = {}
+        # hora de entrada -> nº de registros; como mucho 24 claves
+        self._entradas: Dict[int, int] = {}
     def agregar_registro(self, reg: RegistroHorario):
         if reg.empleado == self.nombre:
+            if self._posicion is not None:
+                self._posicion[reg] = len(self.registros)
             self.registros.append(reg)
+            self._horas += reg.duracion()
+            self._registros_por_dia[reg.dia] = self._registros_por_dia.get(reg.dia, 0) + 1
+            self._entradas[reg.entrada] = self._entradas.get(reg.entrada, 0) + 1
+    def posiciones(self) -> Dict[RegistroHorario, int]:
+        if self._posicion is None:
+            self._posicion = _mapa_posiciones(self.registros)
+        return self._posicion
+    def quitar_registro(self, reg: RegistroHorario):
+        if reg not in self.posiciones():
+            raise ValueError(f"El registro no es de {self.nombre}")
+        _quitar_en_o1(self.registros, self._posicion, reg)
+        self._horas -= reg.duracion()
+        restantes = self._registros_por_dia[reg.dia] - 1
+        if restantes:
+            self._registros_por_dia[reg.dia] = restantes
+        else:
+            del self._registros_por_dia[reg.dia]
+        restantes = self._entradas[reg.entrada] - 1
+        if restantes:
+            self._entradas[reg.entrada] = restantes
+        else:
+            del self._entradas[reg.entrada]
+    def trabaja_dia(self, dia: str) -> bool:
+        return dia in self._registros_por_dia
     def horas_totales(self) -> int:
-        return sum(r.duracion() for r in self.registros)
+        return self._horas
     def dias_distintos(self) -> Set[str]:
-        return {r.dia for r in self.registros}
+        return set(self._registros_por_dia)
+    def num_dias(self) -> int:
+        return len(self._registros_por_dia)
+    def entrada_minima(self) -> int:
+        return min(self._entradas, default=24)
     def fila_resumen(self):
-        return [self.nombre, str(len(self.dias_distintos())), str(self.horas_totales())]
+        return [self.nombre, str(self.num_dias()), str(self.horas_totales())]
+    def resumen(self) -> 'ResumenEmpleado':
+        """Sus totales en cache como ResumenEmpleado, sin recorrer los registros."""
+        res = ResumenEmpleado()
+        res.horas = self._horas
+        res.dias = set(self._registros_por_dia)
+        res.min_entrada = self.entrada_minima()
+        return res
+
+def leer_registros(path: str, delim: str = ';') -> Iterator[RegistroHorario]:
+    """Genera los registros válidos de un CSV de horarios sin cargarlo entero."""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f, delimiter=delim, quotechar='"')
+        first = next(reader, None)
+        if first is None:
+            return
+        header_like = any(h.lower() in ('nombre_empleado','empleado','dia','hora_entrada','hora_salida') for h in first)
+        rows = reader if header_like else chain([first], reader)
+        for fila in rows:
+            if not fila:
+                continue
+            try:
+                nombre, dia, he, hs = fila[:4]
+                entrada, salida = int(he), int(hs)
+            except ValueError:
+                metricas.contar('practica3.filas_rechazadas')
+                continue
+            yield RegistroHorario(nombre, dia, entrada, salida)
+
+class ResumenEmpleado:
+    """Agregados parciales de un empleado: horas, días distintos y entrada más temprana."""
+    __slots__ = ('horas', 'dias', 'min_entrada')
+    def __init__(self):
+        self.horas = 0
+        self.dias: Set[str] = set()
+        self.min_entrada = 24
+    def agregar(self, reg: RegistroHorario):
+        self.horas += reg.duracion()
+        self.dias.add(reg.dia)
+        if reg.entrada < self.min_entrada:
+            self.min_entrada = reg.entrada
+    def fusionar(self, otro: 'ResumenEmpleado'):
+        """Suma los agregados parciales de otro (p. ej. de otro archivo) a este."""
+        self.horas += otro.horas
+        self.dias |= otro.dias
+        if otro.min_entrada < self.min_entrada:
+            self.min_entrada = otro.min_entrada
+
+def resumir_por_empleado(registros: Iterable[RegistroHorario]) -> Dict[str, ResumenEmpleado]:
+    resumenes: Dict[str, ResumenEmpleado] = {}
+    for r in registros:
+        res = resumenes.get(r.empleado)
+        if res is None:
+            res = resumenes[r.empleado] = ResumenEmpleado()
+        res.agregar(r)
+    return resumenes
+
+def _resumir_archivo(path: str, delim: str) -> Dict[str, ResumenEmpleado]:
+    return resumir_por_empleado(leer_registros(path, delim))
+
+def fusionar_resumenes(parciales: Iterable[Dict[str, ResumenEmpleado]]) -> Dict[str, ResumenEmpleado]:
+    resumenes: Dict[str, ResumenEmpleado] = {}
+    for parcial in parciales:
+        for nombre, res in parcial.items():
+            actual = resumenes.get(nombre)
+            if actual is None:
+                resumenes[nombre] = res
+            else:
+                actual.fusionar(res)
+    return resumenes
+
+def resumir_en_paralelo(rutas: Sequence[str], delim: str = ';', procesos: Optional[int] = None) -> Dict[str, ResumenEmpleado]:
+    """resumir_por_empleado sobre varios CSV usando un pool de procesos.
+
+    Cada proceso resume un archivo; el proceso principal fusiona los
+    resúmenes parciales según van llegando. Horas, días y entrada mínima se
+    combinan sin pérdida, así que el resultado es el mismo que leyendo todo
+    en un solo proceso.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    if procesos < 1:
+        raise ValueError("Se necesita al menos un proceso")
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        return fusionar_resumenes(pool.map(_resumir_archivo, rutas, repeat(delim)))
+
+def _fila_resumen_horarios(nombre: str, res: ResumenEmpleado, hora_ref: int):
+    return [nombre, res.horas]
+
+def _fila_resumen_semanal(nombre: str, res: ResumenEmpleado, hora_ref: int):
+    return [nombre, len(res.dias), res.horas]
+
+def _fila_madrugadores(nombre: str, res: ResumenEmpleado, hora_ref: int):
+    return [nombre, res.min_entrada] if res.min_entrada < hora_ref else None
+
+# nombre -> (archivo por defecto, cabecera, fila por empleado o None para omitirlo)
+INFORMES: Dict[str, Tuple[str, List[str], Callable[[str, ResumenEmpleado, int], Optional[list]]]] = {
+    'resumen_horarios': ('resumen_horarios.csv', ['Empleado', 'Horas totales'], _fila_resumen_horarios),
+    'resumen_semanal': ('resumen_semanal.csv', ['Empleado', 'Dias_trabajados', 'Horas_totales'], _fila_resumen_semanal),
+    'madrugadores': ('madrugadores.csv', ['Empleado', 'Hora_entrada'], _fila_madrugadores),
+}
 
 class GestorHorarios:
-    def __init__(self, path='horarios.csv', delim=';'):
+    def __init__(self, path: Union[str, Sequence[str]] = 'horarios.csv', delim=';'):
+        # uno o varios CSV (p. ej. uno por sede y semana)
         self.path = path
+        self.rutas: List[str] = [path] if isinstance(path, str) else list(path)
         self.delim = delim
         self.registros: List[RegistroHorario] = []
+        # registro -> posición en self.registros, para eliminar en O(1); se crea
+        # en el primer borrado, así la carga masiva no paga un dict por registro
+        self._posicion: Optional[Dict[RegistroHorario, int]] = None
         self.empleados: Dict[str, Empleado] = {}
         self.empleados_por_dia: Dict[str, Set[str]] = {}
 
+    @metricas.medido('practica3.leer_csv')
     def leer_csv(self):
         self.registros.clear()
-        if not os.path.exists(self.path):
-            print(f"Archivo no encontrado: {self.path}")
+        rutas = [r for r in self.rutas if os.path.exists(r)]
+        for ruta in self.rutas:
+            if ruta not in rutas:
+                print(f"Archivo no encontrado: {ruta}")
+        if not rutas:
+            self._reconstruir()
             return
-        with open(self.path, newline='', encoding='utf-8') as f:
-            reader = csv.reader(f, delimiter=self.delim, quotechar='"')
-            first = next(reader, None)
-            if first is None:
-                return
-            header_like = any(h.lower() in ('nombre_empleado','empleado','dia','hora_entrada','hora_salida') for h in first)
-            rows = reader if header_like else [first] + list(reader)
-            for fila in rows:
-                if not fila or len(fila) < 4:
-                    continue
-                try:
-                    nombre, dia, he, hs = fila[:4]
-                    entrada, salida = int(he), int(hs)
-                except ValueError:
-                    continue
-                self.registros.append(RegistroHorario(nombre, dia, entrada, salida))
-        self._reconstruir()
-        print(f"Leídos {len(self.registros)} registros desde {self.path}")
+        with metricas.etapa('practica3.leer_csv.parseo'):
+            for ruta in rutas:
+                self.registros.extend(leer_registros(ruta, self.delim))
+        with metricas.etapa('practica3.leer_csv.indices'):
+            self._reconstruir()
+        if metricas.ACTIVO:
+            metricas.contar('practica3.filas_leidas', len(self.registros))
+            metricas.contar('practica3.bytes_leidos', sum(metricas.tamano(r) for r in rutas))
+        print(f"Leídos {len(self.registros)} registros desde {', '.join(rutas)}")
 
     def _reconstruir(self):
+        """Reconstruye todos los índices en una pasada (carga masiva)."""
         self.empleados.clear()
         self.empleados_por_dia.clear()
+        self._posicion = None
         for r in self.registros:
-            if r.empleado not in self.empleados:
-                self.empleados[r.empleado] = Empleado(r.empleado)
-            self.empleados[r.empleado].agregar_registro(r)
-            self.empleados_por_dia.setdefault(r.dia, set()).add(r.empleado)
+            self._indexar(r)
+
+    def _indexar(self, r: RegistroHorario):
+        emp = self.empleados.get(r.empleado)
+        if emp is None:
+            emp = self.empleados[r.empleado] = Empleado(r.empleado)
+        emp.agregar_registro(r)
+        self.empleados_por_dia.setdefault(r.dia, set()).add(r.empleado)
+
+    def agregar_registro(self, reg: RegistroHorario):
+        """Añade un registro actualizando los índices en O(1), sin _reconstruir."""
+        if self._posicion is not None:
+            if reg in self._posicion:
+                raise ValueError("El registro ya está añadido")
+            self._posicion[reg] = len(self.registros)
+        self.registros.append(reg)
+        self._indexar(reg)
+
+    def eliminar_registro(self, reg: RegistroHorario):
+        """Quita un registro y deshace su efecto en los índices, en O(1).
+
+        El último registro pasa a ocupar su hueco, así que no se conserva el
+        orden. El primer borrado construye los mapas de posiciones en O(n).
+        """
+        if self._posicion is None:
+            self._posicion = _mapa_posiciones(self.registros)
+        if reg not in self._posicion:
+            raise ValueError("Registro no encontrado")
+        emp = self.empleados[reg.empleado]
+        emp.posiciones()  # puede fallar: antes de tocar nada
+        _quitar_en_o1(self.registros, self._posicion, reg)
+        emp.quitar_registro(reg)
+        if not emp.trabaja_dia(reg.dia):
+            nombres = self.empleados_por_dia[reg.dia]
+            nombres.discard(reg.empleado)
+            if not nombres:
+                del self.empleados_por_dia[reg.dia]
+        if not emp.registros:
+            del self.empleados[reg.empleado]
 
     def escribir_resumen_horarios(self, salida='resumen_horarios.csv'):
-        horas = {n: e.horas_totales() for n, e in self.empleados.items()}
-        with open(salida, 'w', newline='', encoding='utf-8') as f:
-            w = csv.writer(f, delimiter=self.delim, quotechar='"', quoting=csv.QUOTE_MINIMAL)
-            w.writerow(['Empleado', 'Horas totales'])
-            for nombre, total in sorted(horas.items()):
-                w.writerow([nombre, total])
-        print(f"Generado {salida}")
+        self.generar_informes(['resumen_horarios'], salidas={'resumen_horarios': salida})
 
     def escribir_resumen_semanal(self, salida='resumen_semanal.csv'):
-        with open(salida, 'w', newline='', encoding='utf-8') as f:
-            w = csv.writer(f, delimiter=self.delim, quotechar='"', quoting=csv.QUOTE_MINIMAL)
-            w.writerow(['Empleado', 'Dias_trabajados', 'Horas_totales'])
-            for nombre, emp in sorted(self.empleados.items()):
-                w.writerow(emp.fila_resumen())
-        print(f"Generado {salida}")
+        self.generar_informes(['resumen_semanal'], salidas={'resumen_semanal': salida})
 
     def escribir_madrugadores(self, hora_ref=8, salida='madrugadores.csv'):
-        minimo: Dict[str, int] = {}
-        for r in self.registros:
-            minimo[r.empleado] = min(minimo.get(r.empleado, 24), r.entrada)
-        madrugadores = {e: h for e, h in minimo.items() if h < hora_ref}
-        with open(salida, 'w', newline='', encoding='utf-8') as f:
-            w = csv.writer(f, delimiter=self.delim, quotechar='"', quoting=csv.QUOTE_MINIMAL)
-            w.writerow(['Empleado', 'Hora_entrada'])
-            for nombre, hora in sorted(madrugadores.items()):
-                w.writerow([nombre, hora])
-        print(f"Generado {salida}")
+        self.generar_informes(['madrugadores'], hora_ref, {'madrugadores': salida})
+
+    @metricas.medido('practica3.generar_informes')
+    def generar_informes(self, nombres: Optional[List[str]] = None, hora_ref=8,
+                         salidas: Optional[Dict[str, str]] = None,
+                         registros: Optional[Iterable[RegistroHorario]] = None, paralelo=False,
+                         procesos: Optional[int] = None):
+        """Genera varios informes de INFORMES; es el único camino de escritura de informes.
+
+        Por defecto usa los totales en cache de cada Empleado, sin recorrer
+        los registros. `registros` puede ser cualquier iterable (p. ej.
+        leer_registros(path)) para no tener que cargarlos; con paralelo=True
+        cada archivo se escribe en su propio hilo. Con `procesos` los
+        resúmenes se calculan directamente desde self.rutas con
+        resumir_en_paralelo (no incluye los registros añadidos solo en memoria).
+        """
+        nombres = list(INFORMES) if nombres is None else nombres
+        salidas = salidas or {}
+        if procesos:
+            with metricas.etapa('practica3.generar_informes.procesos'):
+                rutas = [r for r in self.rutas if os.path.exists(r)]
+                resumenes = sorted(resumir_en_paralelo(rutas, self.delim, procesos).items())
+        elif registros is not None:
+            resumenes = sorted(resumir_por_empleado(registros).items())
+        else:
+            resumenes = [(nombre, emp.resumen()) for nombre, emp in sorted(self.empleados.items())]
+
+        def escribir(nombre: str) -> str:
+            archivo, cabecera, fila_de = INFORMES[nombre]
+            archivo = salidas.get(nombre, archivo)
+            with open(archivo, 'w', newline='', encoding='utf-8', buffering=TAM_BUFFER) as f:
+                w = csv.writer(f, delimiter=self.delim, quotechar='"', quoting=csv.QUOTE_MINIMAL)
+                w.writerow(cabecera)
+                for emp, res in resumenes:
+                    fila = fila_de(emp, res, hora_ref)
+                    if fila is not None:
+                        w.writerow(fila)
+            return archivo
+
+        if paralelo and len(nombres) > 1:
+            with ThreadPoolExecutor(max_workers=len(nombres)) as pool:
+                generados = list(pool.map(escribir, nombres))
+        else:
+            generados = [escribir(n) for n in nombres]
+        for archivo in generados:
+            print(f"Generado {archivo}")
 
     def mostrar_resumen_console(self):
         print(f"\nRegistros: {len(self.registros)}")
@@ -101,11 +324,16 @@ class GestorHorarios:
         print(f"Días detectados: {sorted(self.empleados_por_dia.keys())}")
         print("Horas por empleado:")
         for nombre, emp in sorted(self.empleados.items()):
-            print(f"  {nombre}: {emp.horas_totales()}h en {len(emp.dias_distintos())} días")
+            print(f"  {nombre}: {emp.horas_totales()}h en {emp.num_dias()} días")
+
+    def escribir_resumenes(self, salida_horarios='resumen_horarios.csv', salida_semanal='resumen_semanal.csv'):
+        """resumen_horarios.csv y resumen_semanal.csv con una sola llamada a generar_informes."""
+        self.generar_informes(['resumen_horarios', 'resumen_semanal'],
+                              salidas={'resumen_horarios': salida_horarios, 'resumen_semanal': salida_semanal})
 
 # Menú reducido
-def menu_reducido():
-    gestor = GestorHorarios()
+def menu_reducido(rutas: Optional[List[str]] = None):
+    gestor = GestorHorarios(rutas or 'horarios.csv')
     while True:
         print("\n--- MENÚ REDUCIDO ---")
         print("1) Cargar horarios desde CSV")
@@ -113,6 +341,8 @@ def menu_reducido():
         print("3) Generar archivos: resumen_horarios.csv y resumen_semanal.csv")
         print("4) Generar madrugadores.csv (por defecto < 8h)")
         print("5) Añadir registro rápido (memoria)")
+        print("6) Generar todos los informes en una pasada")
+        print("7) Generar todos los informes desde los CSV en paralelo (procesos)")
         print("0) Salir")
         op = input("Elige opción: ").strip()
         if op == '1':
@@ -120,8 +350,7 @@ def menu_reducido():
         elif op == '2':
             gestor.mostrar_resumen_console()
         elif op == '3':
-            gestor.escribir_resumen_horarios()
-            gestor.escribir_resumen_semanal()
+            gestor.escribir_resumenes()
         elif op == '4':
             try:
                 hr = int(input("Hora referencia (por defecto 8): ").strip() or "8")
@@ -137,9 +366,27 @@ def menu_reducido():
             except ValueError:
                 print("Horas inválidas. Registro no añadido.")
                 continue
-            gestor.registros.append(RegistroHorario(nombre, dia, entrada, salida))
-            gestor._reconstruir()
+            gestor.agregar_registro(RegistroHorario(nombre, dia, entrada, salida))
             print("Registro añadido en memoria.")
+        elif op == '6':
+            try:
+                hr = int(input("Hora referencia madrugadores (por defecto 8): ").strip() or "8")
+            except ValueError:
+                hr = 8
+            gestor.generar_informes(hora_ref=hr, paralelo=True)
+        elif op == '7':
+            try:
+                hr = int(input("Hora referencia madrugadores (por defecto 8): ").strip() or "8")
+            except ValueError:
+                hr = 8
+            try:
+                procesos = int(input(f"Procesos (por defecto {os.cpu_count() or 1}): ").strip() or str(os.cpu_count() or 1))
+            except ValueError:
+                procesos = 0
+            if procesos < 1:
+                print("Número de procesos inválido (mínimo 1).")
+                continue
+            gestor.generar_informes(hora_ref=hr, procesos=procesos)
         elif op == '0':
             print("Saliendo.")
             break
@@ -147,4 +394,5 @@ def menu_reducido():
             print("Opción no válida.")
 
 if __name__ == '__main__':
-    menu_reducido()
+    # python practica3.py [horarios1.csv horarios2.csv ...]
+    menu_reducido(sys.argv[1:])